@@ -0,0 +1,53 @@
+"""
+Helpers shared by the run-time benchmarks: build models from the spec bundles
+into a temporary module and measure retained memory.
+"""
+
+import gc
+import importlib.util
+import itertools
+import os
+import sys
+import tempfile
+import tracemalloc
+from collections.abc import Callable
+from types import ModuleType
+from typing import TypeVar
+
+from fhir_py_types.ast import build_ast
+from fhir_py_types.cli import write_module
+from fhir_py_types.reader.bundle import load_from_bundle
+
+T = TypeVar("T")
+
+DEFAULT_BUNDLES = ["spec/fhir.types.json", "spec/fhir.resources.json"]
+
+
+def generate_models(name: str, bundles: list[str], **options: bool) -> ModuleType:
+    path = os.path.join(tempfile.mkdtemp(), f"{name}.py")
+    write_module(
+        path,
+        build_ast(
+            itertools.chain.from_iterable(load_from_bundle(b) for b in bundles),
+            **options,
+        ),
+    )
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    # Forward references are resolved within the module registered in sys.modules
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure_retained(factory: Callable[[], T]) -> tuple[T, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = factory()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained
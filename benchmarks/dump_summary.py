@@ -0,0 +1,76 @@
+"""
+Compare _summary=true serialization of resources from Synthea-like transaction
+bundles: model_dump_summary against filtering model_dump output by lists of
+summary elements.
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+
+from benchmarks.common import DEFAULT_BUNDLES, generate_models
+from benchmarks.samples import make_bundles
+
+
+def measure(dump: Callable[[Any], Any], resources: list[Any]) -> float:
+    started = time.perf_counter()
+    for resource in resources:
+        dump(resource)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure model_dump_summary against filtering dumped dicts"
+    )
+    argparser.add_argument("--from-bundles", action="append")
+    argparser.add_argument("--bundles", type=int, default=50)
+    args = argparser.parse_args()
+
+    models = generate_models(
+        "dump_summary_resources", args.from_bundles or DEFAULT_BUNDLES
+    )
+    resources = [
+        entry.resource
+        for sample in make_bundles(args.bundles)
+        for entry in models.Bundle.model_validate(sample).entry
+    ]
+    # Lists of the summary JSON properties per resource type, as maintained by hand
+    summary_keys = {
+        name: {
+            info.alias
+            for field, info in model.__elements__.items()
+            if field in model.__summary__
+        }
+        for name, model in vars(models).items()
+        if isinstance(getattr(model, "__summary__", None), dict)
+    }
+
+    def filter_dump(resource: BaseModel) -> dict[str, Any]:
+        keys = summary_keys[type(resource).__name__]
+        return {k: v for k, v in resource.model_dump().items() if k in keys}
+
+    for resource in resources:
+        assert set(resource.model_dump_summary()) == set(filter_dump(resource))
+
+    by_type: dict[str, list[Any]] = {}
+    for resource in resources:
+        by_type.setdefault(resource.resourceType, []).append(resource)
+
+    # The gain depends on the share of non-summary content (text, extensions)
+    for resource_type, group in [("all", resources), *sorted(by_type.items())]:
+        rates = [
+            f"{name} {len(group) / measure(dump, group):.0f}"
+            for name, dump in [
+                ("model_dump + filter", filter_dump),
+                ("model_dump_summary", lambda r: r.model_dump_summary()),
+            ]
+        ]
+        print(f"{resource_type} ({len(group)}): {', '.join(rates)} resources/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare exporting Observations of Synthea-like transaction bundles to CSV
+with ColumnExporter against flattening model_dump output row by row.
+"""
+
+import argparse
+import csv
+import io
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+
+from benchmarks.common import DEFAULT_BUNDLES, generate_models
+from benchmarks.samples import make_bundles
+
+PATHS = [
+    "id",
+    "status",
+    "code.coding.code",
+    "subject.reference",
+    "effectiveDateTime",
+    "valueQuantity.value",
+    "valueQuantity.unit",
+]
+
+
+def flatten(resource: BaseModel) -> dict[str, Any]:
+    # Hand-written flattener of the same paths
+    data = resource.model_dump()
+    quantity = data.get("valueQuantity") or {}
+    return {
+        "id": data.get("id"),
+        "status": data.get("status"),
+        "code.coding.code": [c.get("code") for c in data["code"].get("coding", [])],
+        "subject.reference": (data.get("subject") or {}).get("reference"),
+        "effectiveDateTime": data.get("effectiveDateTime"),
+        "valueQuantity.value": quantity.get("value"),
+        "valueQuantity.unit": quantity.get("unit"),
+    }
+
+
+def measure(export: Callable[[], Any], repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        export()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure columnar export against row by row model_dump"
+    )
+    argparser.add_argument("--from-bundles", action="append")
+    argparser.add_argument("--bundles", type=int, default=50)
+    args = argparser.parse_args()
+
+    models = generate_models(
+        "export_columns_resources", args.from_bundles or DEFAULT_BUNDLES
+    )
+    observations = [
+        entry.resource
+        for sample in make_bundles(args.bundles)
+        for entry in models.Bundle.model_validate(sample).entry
+        if entry.resource.resourceType == "Observation"
+    ]
+
+    def rows() -> list[dict[str, Any]]:
+        return [flatten(observation) for observation in observations]
+
+    def rows_csv() -> None:
+        writer = csv.DictWriter(io.StringIO(), PATHS)
+        writer.writeheader()
+        writer.writerows(rows())
+
+    def columns(write: Callable[[Any], None] = lambda exporter: None) -> None:
+        exporter = models.ColumnExporter("Observation", PATHS)
+        exporter.extend(observations)
+        write(exporter)
+
+    def columns_csv() -> None:
+        columns(lambda exporter: exporter.write_csv(io.StringIO()))
+
+    def columns_file() -> None:
+        columns(lambda exporter: exporter.write_columns(io.BytesIO()))
+
+    print(f"{len(observations)} observations, {len(PATHS)} columns")
+    for name, export in [
+        ("model_dump rows", rows),
+        ("model_dump rows + csv", rows_csv),
+        ("ColumnExporter", columns),
+        ("ColumnExporter + csv", columns_csv),
+        ("ColumnExporter + columns file", columns_file),
+    ]:
+        print(f"{name}: {len(observations) / measure(export):.0f} resources/s")
+
+
+if __name__ == "__main__":
+    main()
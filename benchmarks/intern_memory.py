@@ -0,0 +1,70 @@
+"""
+Compare RSS growth of loading Synthea-like transaction bundles from JSON with
+default models and models generated with --intern.
+
+Every mode runs in a fresh process, bundles are validated from their JSON
+documents one by one (as read from files), so every parsed string is a distinct
+object unless the models intern it.
+"""
+
+import argparse
+import gc
+import json
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks.common import DEFAULT_BUNDLES, generate_models
+from benchmarks.samples import make_bundles
+
+
+def load(
+    name: str, options: dict[str, bool], bundles: list[str], count: int
+) -> tuple[int, float, dict[str, int]]:
+    models = generate_models(f"{name}_resources", bundles, **options)
+    samples = make_bundles(count)
+    models.Bundle.model_validate_json(json.dumps(samples[0]))  # build schemas
+    models.intern_table.clear()
+
+    gc.collect()
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    loaded = [models.Bundle.model_validate_json(json.dumps(b)) for b in samples]
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    assert len(loaded) == count
+    # ru_maxrss is reported in kilobytes on Linux, stats are returned as a dict
+    # because the generated module is not importable in the parent process
+    return (after - before) * 1024, elapsed, models.intern_table.stats()._asdict()
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure RSS growth of loading bundles with default and interning models"
+    )
+    argparser.add_argument("--from-bundles", action="append")
+    argparser.add_argument("--bundles", type=int, default=200)
+    args = argparser.parse_args()
+
+    resources = sum(len(b["entry"]) for b in make_bundles(args.bundles))
+    print(f"{args.bundles} bundles, {resources} resources")
+    for name, options in [("default", {}), ("intern", {"intern": True})]:
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            grown, elapsed, stats = executor.submit(
+                load,
+                name,
+                options,
+                args.from_bundles or DEFAULT_BUNDLES,
+                args.bundles,
+            ).result()
+        print(
+            f"{name}: RSS +{grown / 2**20:.1f} MB ({grown / resources:.0f} B/resource), "
+            f"{resources / elapsed:.0f} resources/s, {stats}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Measure memory retained by the intermediate representation
+(StructureDefinition trees) built from a large synthetic corpus.
+
+The corpus mimics loading several FHIR versions together with dozens of
+IG packages: every package is decoded from its own JSON document, so
+repeated strings (codes, docstrings, target profiles) arrive as distinct
+objects exactly as they do when reading real bundles.
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from fhir_py_types import StructureDefinition
+from fhir_py_types.reader.bundle import StringTable, parse_structure_definition
+
+TYPE_CODES = [
+    ("string", []),
+    ("code", []),
+    ("boolean", []),
+    ("dateTime", []),
+    ("CodeableConcept", []),
+    ("Period", []),
+    ("Identifier", []),
+    ("Reference", ["Patient", "Group", "Device", "Location"]),
+    ("Reference", ["Practitioner", "PractitionerRole", "Organization"]),
+]
+
+DOCSTRINGS = [
+    f"Synthetic element definition #{n}. " + "Lorem ipsum dolor sit amet. " * 8
+    for n in range(64)
+]
+
+
+def make_element(resource_type: str, index: int) -> dict:
+    code, targets = TYPE_CODES[index % len(TYPE_CODES)]
+    path = f"{resource_type}.element{index}"
+    return {
+        "id": path,
+        "path": path,
+        "short": "Synthetic element",
+        "definition": DOCSTRINGS[index % len(DOCSTRINGS)],
+        "min": index % 2,
+        "max": "*" if index % 3 == 0 else "1",
+        "type": [
+            {
+                "code": code,
+                "targetProfile": [
+                    f"http://hl7.org/fhir/StructureDefinition/{target}"
+                    for target in targets
+                ],
+            }
+        ],
+    }
+
+
+def make_structure_definition(index: int, elements: int) -> dict:
+    resource_type = f"Resource{index}"
+    return {
+        "resourceType": "StructureDefinition",
+        "id": resource_type,
+        "kind": "resource",
+        "type": resource_type,
+        "snapshot": {
+            "element": [
+                {
+                    "id": resource_type,
+                    "path": resource_type,
+                    "short": "Synthetic resource",
+                    "definition": DOCSTRINGS[index % len(DOCSTRINGS)],
+                    "min": 0,
+                    "max": "*",
+                    "base": {"path": resource_type},
+                },
+                *(make_element(resource_type, n) for n in range(elements)),
+            ]
+        },
+    }
+
+
+def make_package(definitions: int, elements: int) -> str:
+    return json.dumps(
+        [make_structure_definition(n, elements) for n in range(definitions)]
+    )
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure memory retained by the parsed StructureDefinition IR"
+    )
+    argparser.add_argument("--packages", type=int, default=40)
+    argparser.add_argument("--definitions", type=int, default=150)
+    argparser.add_argument("--elements", type=int, default=40)
+    args = argparser.parse_args()
+
+    package = make_package(args.definitions, args.elements)
+
+    gc.collect()
+    tracemalloc.start()
+    retained: list[StructureDefinition] = []
+    # One string table for the whole load, as typegen uses
+    strings: StringTable = {}
+    for _ in range(args.packages):
+        retained.extend(
+            parse_structure_definition(definition, strings)
+            for definition in json.loads(package)
+        )
+    del strings
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = len(retained) * (args.elements + 2)
+    print(f"definitions: {len(retained)}, IR nodes: {nodes}")
+    print(f"retained: {current / 2**20:.1f} MiB ({current / nodes:.0f} B/node)")
+    print(f"peak: {peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Deterministic Synthea-like FHIR R4 transaction bundles.
+
+Resources follow the shape of Synthea output (patient demographics with US Core
+extensions, encounters, conditions and vital sign observations), so benchmarks
+and regression tests can run without downloading the sample data.
+"""
+
+import random
+import uuid
+from typing import Any
+
+LOINC = "http://loinc.org"
+SNOMED = "http://snomed.info/sct"
+UCUM = "http://unitsofmeasure.org"
+
+VITAL_SIGNS = [
+    ("8302-2", "Body Height", "cm", 150.0, 190.0),
+    ("29463-7", "Body Weight", "kg", 50.0, 110.0),
+    ("39156-5", "Body Mass Index", "kg/m2", 18.0, 35.0),
+    ("8867-4", "Heart rate", "/min", 55.0, 100.0),
+    ("9279-1", "Respiratory rate", "/min", 12.0, 20.0),
+    ("72514-3", "Pain severity - 0-10 verbal numeric rating", "{score}", 0.0, 10.0),
+]
+
+CONDITIONS = [
+    ("444814009", "Viral sinusitis (disorder)"),
+    ("195662009", "Acute viral pharyngitis (disorder)"),
+    ("10509002", "Acute bronchitis (disorder)"),
+    ("162864005", "Body mass index 30+ - obesity (finding)"),
+    ("15777000", "Prediabetes"),
+]
+
+GIVEN_NAMES = ["Ana", "Bo", "Carmen", "Dmitri", "Elif", "Femi", "Gus", "Hana"]
+FAMILY_NAMES = ["Lind", "Okafor", "Quigley", "Reyes", "Sato", "Tremblay", "Vogel"]
+CITIES = [("Boston", "02108"), ("Springfield", "01101"), ("Worcester", "01601")]
+
+
+def make_uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def make_coding(system: str, code: str, display: str) -> dict[str, Any]:
+    return {"system": system, "code": code, "display": display}
+
+
+def make_patient(rng: random.Random, id_: str) -> dict[str, Any]:
+    city, postal_code = rng.choice(CITIES)
+    return {
+        "resourceType": "Patient",
+        "id": id_,
+        "text": {
+            "status": "generated",
+            "div": '<div xmlns="http://www.w3.org/1999/xhtml">Generated by Synthea</div>',
+        },
+        "extension": [
+            {
+                "url": "http://hl7.org/fhir/us/core/StructureDefinition/us-core-race",
+                "extension": [
+                    {
+                        "url": "ombCategory",
+                        "valueCoding": make_coding(
+                            "urn:oid:2.16.840.1.113883.6.238", "2106-3", "White"
+                        ),
+                    },
+                    {"url": "text", "valueString": "White"},
+                ],
+            },
+            {
+                "url": "http://hl7.org/fhir/StructureDefinition/patient-birthPlace",
+                "valueAddress": {"city": city, "state": "MA", "country": "US"},
+            },
+        ],
+        "identifier": [
+            {"system": "https://github.com/synthetichealth/synthea", "value": id_},
+            {
+                "type": {
+                    "coding": [
+                        make_coding(
+                            "http://terminology.hl7.org/CodeSystem/v2-0203",
+                            "MR",
+                            "Medical Record Number",
+                        )
+                    ],
+                    "text": "Medical Record Number",
+                },
+                "system": "http://hospital.smarthealthit.org",
+                "value": id_,
+            },
+        ],
+        "name": [
+            {
+                "use": "official",
+                "family": rng.choice(FAMILY_NAMES),
+                "given": [rng.choice(GIVEN_NAMES)],
+                "prefix": [rng.choice(["Mr.", "Ms.", "Mrs."])],
+            }
+        ],
+        "telecom": [
+            {
+                "system": "phone",
+                "value": f"555-{rng.randrange(10000):04d}",
+                "use": "home",
+            }
+        ],
+        "gender": rng.choice(["male", "female"]),
+        "birthDate": f"{rng.randrange(1930, 2015)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+        "address": [
+            {
+                "line": [f"{rng.randrange(1, 999)} Main Street"],
+                "city": city,
+                "state": "MA",
+                "postalCode": postal_code,
+                "country": "US",
+            }
+        ],
+        "maritalStatus": {
+            "coding": [
+                make_coding(
+                    "http://terminology.hl7.org/CodeSystem/v3-MaritalStatus",
+                    "M",
+                    "M",
+                )
+            ],
+            "text": "M",
+        },
+        "multipleBirthBoolean": False,
+        "communication": [
+            {
+                "language": {
+                    "coding": [make_coding("urn:ietf:bcp:47", "en-US", "English")],
+                    "text": "English",
+                }
+            }
+        ],
+    }
+
+
+def make_encounter(
+    rng: random.Random, patient_url: str, start: str, end: str
+) -> dict[str, Any]:
+    return {
+        "resourceType": "Encounter",
+        "id": make_uuid(rng),
+        "status": "finished",
+        "class": {
+            "system": "http://terminology.hl7.org/CodeSystem/v3-ActCode",
+            "code": "AMB",
+        },
+        "type": [
+            {
+                "coding": [make_coding(SNOMED, "185345009", "Encounter for symptom")],
+                "text": "Encounter for symptom",
+            }
+        ],
+        "subject": {"reference": patient_url},
+        "period": {"start": start, "end": end},
+    }
+
+
+def make_condition(
+    rng: random.Random, patient_url: str, encounter_url: str, onset: str
+) -> dict[str, Any]:
+    code, display = rng.choice(CONDITIONS)
+    return {
+        "resourceType": "Condition",
+        "id": make_uuid(rng),
+        "clinicalStatus": {
+            "coding": [
+                {
+                    "system": "http://terminology.hl7.org/CodeSystem/condition-clinical",
+                    "code": "active",
+                }
+            ]
+        },
+        "verificationStatus": {
+            "coding": [
+                {
+                    "system": "http://terminology.hl7.org/CodeSystem/condition-ver-status",
+                    "code": "confirmed",
+                }
+            ]
+        },
+        "code": {"coding": [make_coding(SNOMED, code, display)], "text": display},
+        "subject": {"reference": patient_url},
+        "encounter": {"reference": encounter_url},
+        "onsetDateTime": onset,
+        "recordedDate": onset,
+    }
+
+
+def make_observation(
+    rng: random.Random, patient_url: str, encounter_url: str, effective: str
+) -> dict[str, Any]:
+    code, display, unit, low, high = rng.choice(VITAL_SIGNS)
+    return {
+        "resourceType": "Observation",
+        "id": make_uuid(rng),
+        "status": "final",
+        "category": [
+            {
+                "coding": [
+                    make_coding(
+                        "http://terminology.hl7.org/CodeSystem/observation-category",
+                        "vital-signs",
+                        "vital-signs",
+                    )
+                ]
+            }
+        ],
+        "code": {"coding": [make_coding(LOINC, code, display)], "text": display},
+        "subject": {"reference": patient_url},
+        "encounter": {"reference": encounter_url},
+        "effectiveDateTime": effective,
+        "issued": effective.replace("+00:00", ".000+00:00"),
+        "valueQuantity": {
+            "value": round(rng.uniform(low, high), 1),
+            "unit": unit,
+            "system": UCUM,
+            "code": unit,
+        },
+    }
+
+
+def make_entry(resource: dict[str, Any], full_url: str) -> dict[str, Any]:
+    return {
+        "fullUrl": full_url,
+        "resource": resource,
+        "request": {"method": "POST", "url": resource["resourceType"]},
+    }
+
+
+def make_bundle(
+    rng: random.Random, encounters: int = 10, observations: int = 8
+) -> dict[str, Any]:
+    patient_id = make_uuid(rng)
+    patient_url = f"urn:uuid:{patient_id}"
+    entries = [make_entry(make_patient(rng, patient_id), patient_url)]
+
+    for _ in range(encounters):
+        year = rng.randrange(2000, 2020)
+        day = f"{year}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}"
+        start, end = f"{day}T09:00:00+00:00", f"{day}T09:30:00+00:00"
+
+        encounter = make_encounter(rng, patient_url, start, end)
+        encounter_url = f"urn:uuid:{encounter['id']}"
+        entries.append(make_entry(encounter, encounter_url))
+
+        if rng.random() < 0.3:
+            condition = make_condition(rng, patient_url, encounter_url, start)
+            entries.append(make_entry(condition, f"urn:uuid:{condition['id']}"))
+
+        for _ in range(observations):
+            observation = make_observation(rng, patient_url, encounter_url, start)
+            entries.append(make_entry(observation, f"urn:uuid:{observation['id']}"))
+
+    return {"resourceType": "Bundle", "type": "transaction", "entry": entries}
+
+
+def make_bundles(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [make_bundle(rng) for _ in range(count)]
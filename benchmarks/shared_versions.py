@@ -0,0 +1,114 @@
+"""
+Compare loading several FHIR versions into one process from separate modules
+and from per-version modules importing a shared module (typegen --outdir).
+
+Every layout is loaded in a fresh process: the modules are imported and the
+schemas of all models are built, as they would be after the models are used.
+"""
+
+import argparse
+import gc
+import importlib
+import itertools
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from pydantic import BaseModel
+
+from fhir_py_types import StructureDefinition
+from fhir_py_types.ast import build_ast, build_shared_ast
+from fhir_py_types.cli import load_from_path, parse_version_paths, write_module
+
+DEFAULT_VERSIONS = [
+    "r4=spec/r4/fhir.types.json",
+    "r4=spec/r4/fhir.resources.json",
+    "r5=spec/r5/fhir.types.json",
+    "r5=spec/r5/fhir.resources.json",
+]
+
+
+def write_layout(layout: str, versions: dict[str, list[str]]) -> str:
+    directory = tempfile.mkdtemp()
+    package = os.path.join(directory, f"{layout}_versions")
+    os.makedirs(package)
+    open(os.path.join(package, "__init__.py"), "w").close()
+
+    def load(paths: list[str]) -> list[StructureDefinition]:
+        return list(itertools.chain.from_iterable(load_from_path(p) for p in paths))
+
+    if layout == "shared":
+        shared_ast, versions_ast = build_shared_ast(
+            {version: load(paths) for version, paths in versions.items()}
+        )
+        if shared_ast:
+            write_module(os.path.join(package, "shared.py"), shared_ast)
+    else:
+        versions_ast = {
+            version: list(build_ast(load(paths))) for version, paths in versions.items()
+        }
+    for version, ast_ in versions_ast.items():
+        write_module(os.path.join(package, f"{version}.py"), ast_)
+    return directory
+
+
+def load_layout(directory: str, layout: str, versions: list[str]) -> dict[str, float]:
+    sys.path.insert(0, directory)
+    gc.collect()
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.perf_counter()
+    modules = [importlib.import_module(f"{layout}_versions.{v}") for v in versions]
+    imported = time.perf_counter()
+    models = {
+        id(model): model
+        for module in modules
+        for model in vars(module).values()
+        if isinstance(model, type)
+        and issubclass(model, BaseModel)
+        and model.__module__.startswith(f"{layout}_versions.")
+        # Shared templates are only built through their per-version subclasses
+        and not model.__name__.startswith("_")
+    }
+    for model in models.values():
+        model.model_rebuild()
+    built = time.perf_counter()
+
+    gc.collect()
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "import": imported - started,
+        "build": built - imported,
+        "models": len(models),
+        # ru_maxrss is reported in kilobytes on Linux
+        "rss": (after - before) / 1024,
+    }
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure loading versions from separate modules and with a shared module"
+    )
+    argparser.add_argument("--from-version", action="append", metavar="VERSION=PATH")
+    args = argparser.parse_args()
+
+    versions = parse_version_paths(argparser, args.from_version or DEFAULT_VERSIONS)
+    for layout in ["separate", "shared"]:
+        directory = write_layout(layout, versions)
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            stats = executor.submit(
+                load_layout, directory, layout, list(versions)
+            ).result()
+        print(
+            f"{layout}: import {stats['import']:.2f}s, "
+            f"schemas {stats['build']:.2f}s, {stats['models']} model classes, "
+            f"RSS +{stats['rss']:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
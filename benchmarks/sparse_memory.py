@@ -0,0 +1,51 @@
+"""
+Compare memory retained per validated resource by default and sparse models
+(generated with --sparse) on Synthea-like transaction bundles.
+"""
+
+import argparse
+import functools
+import time
+from types import ModuleType
+from typing import Any
+
+from benchmarks.common import DEFAULT_BUNDLES, generate_models, measure_retained
+from benchmarks.samples import make_bundles
+
+
+def validate_bundles(models: ModuleType, samples: list[dict[str, Any]]) -> list[Any]:
+    return [models.Bundle.model_validate(b) for b in samples]
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure bytes per instance of default and sparse models"
+    )
+    argparser.add_argument("--from-bundles", action="append")
+    argparser.add_argument("--bundles", type=int, default=50)
+    args = argparser.parse_args()
+
+    samples = make_bundles(args.bundles)
+    resources = sum(len(b["entry"]) for b in samples)
+
+    for name, options in [("default", {}), ("sparse", {"sparse": True})]:
+        models = generate_models(
+            f"{name}_resources", args.from_bundles or DEFAULT_BUNDLES, **options
+        )
+        models.Bundle.model_validate(samples[0])  # build schemas before measuring
+
+        started = time.perf_counter()
+        bundles, retained = measure_retained(
+            functools.partial(validate_bundles, models, samples)
+        )
+        elapsed = time.perf_counter() - started
+
+        assert [b.model_dump() for b in bundles] == samples
+        print(
+            f"{name}: {retained / resources:.0f} B/resource, "
+            f"{resources / elapsed:.0f} resources/s (validation under tracemalloc)"
+        )
+
+
+if __name__ == "__main__":
+    main()
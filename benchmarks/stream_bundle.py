@@ -0,0 +1,72 @@
+"""
+Compare peak memory and throughput of validating one large Bundle file
+with model_validate_json against streaming its entries with iter_bundle_entries.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.common import DEFAULT_BUNDLES, generate_models
+from benchmarks.samples import make_bundles
+
+
+def measure_peak(run: Callable[[], Any]) -> tuple[int, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure peak memory of model_validate_json and iter_bundle_entries"
+    )
+    argparser.add_argument("--from-bundles", action="append")
+    argparser.add_argument("--bundles", type=int, default=50)
+    args = argparser.parse_args()
+
+    samples = make_bundles(args.bundles)
+    entries = [entry for bundle in samples for entry in bundle["entry"]]
+    path = os.path.join(tempfile.mkdtemp(), "bundle.json")
+    with open(path, "w") as bundle_file:
+        json.dump(
+            {"resourceType": "Bundle", "type": "batch", "entry": entries}, bundle_file
+        )
+
+    models = generate_models(
+        "stream_bundle_resources", args.from_bundles or DEFAULT_BUNDLES
+    )
+    models.Bundle.model_validate(samples[0])  # build schemas before measuring
+
+    def validate() -> None:
+        with open(path, "rb") as bundle_file:
+            models.Bundle.model_validate_json(bundle_file.read())
+
+    def stream() -> None:
+        with open(path, "rb") as bundle_file:
+            for _ in models.iter_bundle_entries(bundle_file):
+                pass
+
+    print(f"{os.path.getsize(path) / 2**20:.1f} MB, {len(entries)} entries")
+    for name, run in [
+        ("model_validate_json", validate),
+        ("iter_bundle_entries", stream),
+    ]:
+        peak, elapsed = measure_peak(run)
+        print(
+            f"{name}: peak {peak / 2**20:.1f} MB, "
+            f"{len(entries) / elapsed:.0f} resources/s (under tracemalloc)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare cold mypy runs over a module using the generated models with and without
+the .pyi stub written next to them by --stubs.
+
+The spec bundles can be extended with the synthetic resources of ir_memory
+to approach the size of the generated modules of real FHIR versions.
+"""
+
+import argparse
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import DEFAULT_BUNDLES
+from benchmarks.ir_memory import make_structure_definition
+from fhir_py_types.ast import build_ast
+from fhir_py_types.cli import write_module, write_stub
+from fhir_py_types.reader.bundle import load_from_bundle, parse_structure_definition
+
+CLIENT = """
+from resources import Bundle, Observation, Patient
+
+patient = Patient.model_validate({"resourceType": "Patient"})
+observation = Observation.model_validate({"resourceType": "Observation"})
+bundle = Bundle.model_validate({"resourceType": "Bundle"})
+"""
+
+
+def measure_cold(directory: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "mypy",
+                "--cache-dir",
+                tempfile.mkdtemp(),
+                os.path.join(directory, "client.py"),
+            ],
+            cwd=directory,
+            check=True,
+            capture_output=True,
+        )
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure cold mypy runs on generated modules with and without stubs"
+    )
+    argparser.add_argument("--from-bundles", action="append")
+    argparser.add_argument("--synthetic", type=int, default=0)
+    argparser.add_argument("--elements", type=int, default=40)
+    argparser.add_argument("--repeat", type=int, default=3)
+    args = argparser.parse_args()
+
+    ast_ = list(
+        build_ast(
+            itertools.chain(
+                itertools.chain.from_iterable(
+                    load_from_bundle(bundle)
+                    for bundle in args.from_bundles or DEFAULT_BUNDLES
+                ),
+                (
+                    parse_structure_definition(
+                        make_structure_definition(n, args.elements)
+                    )
+                    for n in range(args.synthetic)
+                ),
+            )
+        )
+    )
+
+    directories = {}
+    for name in ["module", "stub"]:
+        directory = directories[name] = tempfile.mkdtemp()
+        write_module(os.path.join(directory, "resources.py"), ast_)
+        if name == "stub":
+            write_stub(os.path.join(directory, "resources.py"), ast_)
+        with open(os.path.join(directory, "client.py"), "w") as client_file:
+            client_file.write(CLIENT)
+
+    for name, directory in directories.items():
+        # mypy reads the stub only when it is present
+        checked = os.path.join(
+            directory, "resources.pyi" if name == "stub" else "resources.py"
+        )
+        with open(checked) as checked_file:
+            lines = len(checked_file.readlines())
+        print(
+            f"{name}: {lines} checked lines, "
+            f"cold mypy {measure_cold(directory, args.repeat):.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compare validation of Synthea-like transaction bundles from raw JSON bytes:
+json.loads followed by model_validate against model_validate_json, with default
+and `resource_union=True` models.
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.common import DEFAULT_BUNDLES, generate_models
+from benchmarks.samples import make_bundles
+
+
+def measure(validate: Callable[[bytes], Any], payloads: list[bytes]) -> float:
+    started = time.perf_counter()
+    for payload in payloads:
+        validate(payload)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure json.loads + model_validate against model_validate_json"
+    )
+    argparser.add_argument("--from-bundles", action="append")
+    argparser.add_argument("--bundles", type=int, default=50)
+    argparser.add_argument("--repeat", type=int, default=5)
+    args = argparser.parse_args()
+
+    samples = make_bundles(args.bundles)
+    payloads = [json.dumps(b).encode() for b in samples]
+    resources = sum(len(b["entry"]) for b in samples)
+
+    for layout, options in [
+        ("default", {}),
+        ("resource_union", {"resource_union": True}),
+    ]:
+        models = generate_models(
+            f"validate_json_{layout}_resources",
+            args.from_bundles or DEFAULT_BUNDLES,
+            **options,
+        )
+        models.Bundle.model_validate(samples[0])  # build schemas before measuring
+
+        python = models.Bundle.model_validate(json.loads(payloads[0]))
+        assert models.Bundle.model_validate_json(payloads[0]) == python
+
+        validate_python = models.Bundle.model_validate
+        for name, validate in [
+            (
+                "json.loads + model_validate",
+                lambda p, validate_python=validate_python: validate_python(
+                    json.loads(p)
+                ),
+            ),
+            ("model_validate_json", models.Bundle.model_validate_json),
+        ]:
+            elapsed = min(measure(validate, payloads) for _ in range(args.repeat))
+            print(f"{layout} {name}: {resources / elapsed:.0f} resources/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measure model_validate_json throughput of Synthea-like transaction bundles
+scaling from 1 to N threads of a ThreadPoolExecutor and 1 to N processes
+of a ProcessPoolExecutor.
+
+Threads share one module, so their scaling is bounded by the GIL unless
+Python is built free-threaded. Every process generates models of its own.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from types import ModuleType
+
+from benchmarks.common import DEFAULT_BUNDLES, generate_models
+from benchmarks.samples import make_bundles
+
+models: ModuleType | None = None
+
+
+def init_models(bundles: list[str], warmup: bytes) -> None:
+    global models
+    models = generate_models("validate_threads_resources", bundles)
+    models.Bundle.model_validate_json(warmup)  # build schemas before measuring
+
+
+def validate(payload: bytes) -> int:
+    assert models is not None
+    return len(models.Bundle.model_validate_json(payload).entry)
+
+
+def measure(executor: Executor, payloads: list[bytes]) -> tuple[int, float]:
+    started = time.perf_counter()
+    resources = sum(executor.map(validate, payloads))
+    return resources, time.perf_counter() - started
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="Measure validation throughput scaling with threads and processes"
+    )
+    argparser.add_argument("--from-bundles", action="append")
+    argparser.add_argument("--bundles", type=int, default=200)
+    argparser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = argparser.parse_args()
+
+    bundles = args.from_bundles or DEFAULT_BUNDLES
+    payloads = [json.dumps(b).encode() for b in make_bundles(args.bundles)]
+    init_models(bundles, payloads[0])
+
+    executors: list[tuple[str, Callable[[int], Executor]]] = [
+        ("threads", ThreadPoolExecutor),
+        (
+            "processes",
+            lambda workers: ProcessPoolExecutor(
+                workers,
+                mp_context=get_context("spawn"),
+                initializer=init_models,
+                initargs=(bundles, payloads[0]),
+            ),
+        ),
+    ]
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{len(payloads)} bundles, GIL {'enabled' if gil else 'disabled'}")
+    for name, make_executor in executors:
+        baseline = None
+        workers = 1
+        while workers <= args.workers:
+            with make_executor(workers) as executor:
+                # Start the workers before measuring
+                list(executor.map(validate, payloads[:workers]))
+                resources, elapsed = measure(executor, payloads)
+            rate = resources / elapsed
+            baseline = baseline or rate
+            print(f"{name} {workers}: {rate:.0f} resources/s ({rate / baseline:.2f}x)")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
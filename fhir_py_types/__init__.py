@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from dataclasses import dataclass
 from enum import Enum
 
@@ -26,23 +27,36 @@ class StructureDefinitionKind(Enum):
                 raise ValueError(f"Unknown StructureDefinition kind: {kind}")
 
 
-@dataclass(frozen=True)
+# The IR is kept compact as many versions and IG packages might be loaded at once:
+# instances are slotted and sequences are stored as tuples (any sequence is accepted
+# on construction). Repeated strings are deduplicated by the readers.
+
+
+@dataclass(frozen=True, slots=True)
 class StructurePropertyType:
     code: str
     required: bool = False
     isarray: bool = False
     literal: bool = False
-    target_profile: list[str] | None = None
+    target_profile: Sequence[str] | None = None
     alias: str | None = None
 
+    def __post_init__(self: "StructurePropertyType") -> None:
+        if self.target_profile is not None:
+            object.__setattr__(self, "target_profile", tuple(self.target_profile))
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class StructureDefinition:
     id: str
     docstring: str
-    type: list[StructurePropertyType]
+    type: Sequence[StructurePropertyType]
     elements: dict[str, "StructureDefinition"]
     kind: StructureDefinitionKind | None = None
+    summary: bool = False
+
+    def __post_init__(self: "StructureDefinition") -> None:
+        object.__setattr__(self, "type", tuple(self.type))
 
 
 def is_polymorphic(definition: StructureDefinition) -> bool:
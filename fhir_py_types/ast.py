@@ -1,8 +1,9 @@
 import ast
+import copy
 import itertools
 import keyword
 import logging
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
 from dataclasses import replace
 from enum import Enum, auto
 from typing import Literal
@@ -17,6 +18,20 @@ from fhir_py_types import (
 
 logger = logging.getLogger(__name__)
 
+# Header defined mixins providing run-time helpers for particular resources
+RESOURCE_MIXINS = {"Bundle": "BundleMixin"}
+
+# Primitive types of values repeated across resources (systems, codes, resource types),
+# their aliases intern validated values in models generated with `intern=True`
+INTERNED_PRIMITIVES = {"uri", "code", "canonical", "id"}
+
+# Class attributes generated along with the fields are declared as class variables in stubs
+STUB_CLASS_VARIABLES = {
+    "__elements__": "ClassVar_[dict[str, ElementInfo]]",
+    "__reference_targets__": "ClassVar_[dict[str, tuple[str, ...]]]",
+    "__summary__": "ClassVar_[dict[str, Any_]]",
+}
+
 
 class AnnotationForm(Enum):
     Property = auto()
@@ -132,7 +147,7 @@ def zip_identifier_type(
                     f"{name}__ext",
                     StructurePropertyType(
                         code="Element",
-                        target_profile=[],
+                        target_profile=(),
                         required=False,
                         isarray=definition.type[0].isarray,
                         alias=f"_{name}"
@@ -189,14 +204,143 @@ def order_type_overriding_properties(
     )
 
 
-def define_class_object(
+def define_reference_targets(
+    properties_definition: dict[str, StructureDefinition],
+) -> Iterable[ast.stmt]:
+    # Allowed target resource types of Reference properties, looked up
+    # by the run-time reference resolution (e.g. BundleIndex.resolve)
+    targets = [
+        (
+            identifier_ + "_" if keyword.iskeyword(identifier_) else identifier_,
+            type_.target_profile,
+        )
+        for identifier, definition in properties_definition.items()
+        for identifier_, type_ in zip_identifier_type(definition, identifier)
+        if type_.code == "Reference" and type_.target_profile
+    ]
+    if not targets:
+        return []
+
+    return [
+        ast.Assign(
+            targets=[ast.Name("__reference_targets__")],
+            value=ast.Dict(
+                keys=[ast.Constant(identifier) for identifier, _ in targets],
+                values=[
+                    ast.Tuple(elts=[ast.Constant(profile) for profile in profiles])
+                    for _, profiles in targets
+                ],
+            ),
+        )
+    ]
+
+
+def define_elements(
     definition: StructureDefinition,
+) -> Iterable[ast.stmt]:
+    # Element metadata of every model field, looked up by the run-time
+    # path accessors (e.g. compile_path) instead of model fields introspection
+    elements = [
+        (
+            identifier_ + "_" if keyword.iskeyword(identifier_) else identifier_,
+            (
+                identifier + "[x]" if is_polymorphic(property) else identifier,
+                (
+                    "Resource"
+                    if type_.code == "AnyResource"
+                    else clear_primitive_id(type_.code)
+                    if is_primitive_type(type_)
+                    else type_.code
+                ),
+                type_.alias or identifier_,
+                type_.isarray,
+                type_.required,
+            ),
+        )
+        for identifier, property in order_type_overriding_properties(
+            definition.elements
+        )
+        for identifier_, type_ in zip_identifier_type(property, identifier)
+    ]
+    if not elements:
+        return []
+
+    return [
+        ast.Assign(
+            targets=[ast.Name("__elements__")],
+            value=ast.Dict(
+                keys=[ast.Constant(identifier) for identifier, _ in elements],
+                values=[
+                    ast.Call(
+                        ast.Name("ElementInfo"),
+                        args=[ast.Constant(value) for value in info],
+                        keywords=[],
+                    )
+                    for _, info in elements
+                ],
+            ),
+        )
+    ]
+
+
+def make_summary_include(definition: StructureDefinition) -> ast.Dict:
+    # Nested include of summary elements, backbone elements are included
+    # by their own summary elements while data types are included as a whole
+    keys: list[ast.expr | None] = []
+    values: list[ast.expr] = []
+    for identifier, property in order_type_overriding_properties(definition.elements):
+        if not property.summary:
+            continue
+        for identifier_, type_ in zip_identifier_type(property, identifier):
+            include: ast.expr = ast.Constant(True)
+            if (
+                property.kind == StructureDefinitionKind.COMPLEX
+                and (nested := make_summary_include(property)).keys
+            ):
+                include = (
+                    ast.Dict(keys=[ast.Constant("__all__")], values=[nested])
+                    if type_.isarray
+                    else nested
+                )
+            keys.append(
+                ast.Constant(
+                    identifier_ + "_" if keyword.iskeyword(identifier_) else identifier_
+                )
+            )
+            values.append(include)
+    return ast.Dict(keys=keys, values=values)
+
+
+def define_summary(definition: StructureDefinition) -> Iterable[ast.stmt]:
+    # Include of the _summary=true output passed to model_dump by model_dump_summary
+    if definition.kind != StructureDefinitionKind.RESOURCE:
+        return []
+
+    # resourceType is always in the summary, definitions that don't mark
+    # any other element are dumped as a whole
+    if not any(
+        property.summary and not any(type_.literal for type_ in property.type)
+        for property in definition.elements.values()
+    ):
+        return []
+
+    return [
+        ast.Assign(
+            targets=[ast.Name("__summary__")], value=make_summary_include(definition)
+        )
+    ]
+
+
+def define_class_object(
+    definition: StructureDefinition, sparse: bool = False
 ) -> Iterable[ast.stmt | ast.expr]:
     bases: list[ast.expr] = []
     if definition.kind == StructureDefinitionKind.RESOURCE:
         bases.append(ast.Name("AnyResource"))
+        if definition.id in RESOURCE_MIXINS:
+            bases.append(ast.Name(RESOURCE_MIXINS[definition.id]))
     # BaseModel should be the last, because it overrides `extra`
-    bases.append(ast.Name("BaseModel"))
+    bases.append(ast.Name("SparseBaseModel" if sparse else "BaseModel"))
 
     return [
         ast.ClassDef(
@@ -210,6 +354,9 @@ def define_class_object(
                         definition.elements
                     )
                 ),
+                *define_reference_targets(definition.elements),
+                *define_elements(definition),
+                *define_summary(definition),
             ],
             decorator_list=[],
             keywords=[],
@@ -218,15 +365,45 @@ def define_class_object(
     ]
 
 
-def define_class(definition: StructureDefinition) -> Iterable[ast.stmt | ast.expr]:
-    return define_class_object(definition)
+def define_class(
+    definition: StructureDefinition, sparse: bool = False
+) -> Iterable[ast.stmt | ast.expr]:
+    return define_class_object(definition, sparse=sparse)
 
 
-def define_alias(definition: StructureDefinition) -> Iterable[ast.stmt]:
+def define_alias(
+    definition: StructureDefinition, intern: bool = False
+) -> Iterable[ast.stmt]:
     # Primitive types are renamed to another name to avoid overlapping with model fields
-    return type_annotate(
+    statements = type_annotate(
         definition, make_primitive_id(definition.id), AnnotationForm.TypeAlias
     )
+    if not intern or definition.id not in INTERNED_PRIMITIVES:
+        return statements
+    return [intern_alias(statement) for statement in statements]
+
+
+def intern_alias(statement: ast.stmt) -> ast.stmt:
+    match statement:
+        case ast.Assign(targets=targets, value=value):
+            return ast.Assign(
+                targets=targets,
+                value=ast.Subscript(
+                    value=ast.Name("Annotated_"),
+                    slice=ast.Tuple(
+                        elts=[
+                            value,
+                            ast.Call(
+                                func=ast.Name("AfterValidator"),
+                                args=[ast.Name("intern_table")],
+                                keywords=[],
+                            ),
+                        ]
+                    ),
+                ),
+            )
+        case _:
+            return statement
 
 
 def make_primitive_id(name: str) -> str:
@@ -264,28 +441,296 @@ def iterate_definitions_tree(
     yield root
 
 
-def build_ast(
+def define_definitions(
     structure_definitions: Iterable[StructureDefinition],
-) -> Iterable[ast.stmt | ast.expr]:
-    structure_definitions = list(structure_definitions)
-    typedefinitions: list[ast.stmt | ast.expr] = []
-
+    sparse: bool = False,
+    intern: bool = False,
+) -> Iterable[tuple[str, list[ast.stmt | ast.expr]]]:
     for root in structure_definitions:
         for definition in iterate_definitions_tree(root):
             match definition.kind:
                 case StructureDefinitionKind.RESOURCE | StructureDefinitionKind.COMPLEX:
-                    typedefinitions.extend(define_class(definition))
+                    yield definition.id, list(define_class(definition, sparse=sparse))
 
                 case StructureDefinitionKind.PRIMITIVE:
-                    typedefinitions.extend(define_alias(definition))
+                    yield make_primitive_id(definition.id), list(
+                        define_alias(definition, intern=intern)
+                    )
 
                 case _:
                     logger.warning(
                         f"Unsupported definition {definition.id} of kind {definition.kind}, skipping"
                     )
 
+
+def define_options(resource_union: bool = False) -> list[ast.stmt | ast.expr]:
+    # Header options overridden by the generated module
+    return (
+        [ast.Assign(targets=[ast.Name("RESOURCE_UNION")], value=ast.Constant(True))]
+        if resource_union
+        else []
+    )
+
+
+def build_ast(
+    structure_definitions: Iterable[StructureDefinition],
+    sparse: bool = False,
+    intern: bool = False,
+    resource_union: bool = False,
+) -> Iterable[ast.stmt | ast.expr]:
+    typedefinitions: list[ast.stmt | ast.expr] = [
+        *define_options(resource_union=resource_union),
+        *itertools.chain.from_iterable(
+            statements
+            for _, statements in define_definitions(
+                structure_definitions, sparse=sparse, intern=intern
+            )
+        ),
+    ]
+
     return sorted(
         typedefinitions,
         # Defer any postprocessing until after the structure tree is defined.
         key=lambda definition: 1 if isinstance(definition, ast.Call) else 0,
     )
+
+
+def build_stub_ast(
+    statements: Iterable[ast.stmt | ast.expr],
+) -> list[ast.stmt | ast.expr]:
+    # Stubs keep declarations only, docstrings and class attribute values are dropped
+    stub: list[ast.stmt | ast.expr] = []
+    for statement in statements:
+        match statement:
+            case ast.Expr(value=ast.Constant(value=str())):
+                continue
+            case ast.ClassDef(body=body):
+                class_def = copy.copy(statement)
+                class_def.body = [
+                    s for s in build_stub_ast(body) if isinstance(s, ast.stmt)
+                ] or [ast.Expr(value=ast.Constant(Ellipsis))]
+                stub.append(class_def)
+            case ast.If(test=ast.Name(id="TYPE_CHECKING"), body=body):
+                stub.extend(build_stub_ast(body))
+            case ast.Assign(value=ast.Attribute()):
+                # Class attributes of the shared template subclasses are declared by the template
+                continue
+            case ast.Assign(
+                targets=[ast.Name(id=name)]
+            ) if name in STUB_CLASS_VARIABLES:
+                stub.append(
+                    ast.AnnAssign(
+                        target=ast.Name(name),
+                        annotation=ast.parse(
+                            STUB_CLASS_VARIABLES[name], mode="eval"
+                        ).body,
+                        simple=1,
+                    )
+                )
+            case _:
+                stub.append(statement)
+    return stub
+
+
+def select_annotation_names(annotation: ast.expr) -> Iterable[str]:
+    match annotation:
+        case ast.Subscript(value=ast.Name(id="Literal_")):
+            # Literal values are not references to other definitions
+            return []
+        case ast.Subscript(value=value, slice=slice_):
+            return [*select_annotation_names(value), *select_annotation_names(slice_)]
+        case ast.Name(id=name) | ast.Constant(value=str() as name):
+            return [name]
+        case _:
+            return []
+
+
+def select_referenced_names(statement: ast.stmt | ast.expr) -> Iterable[str]:
+    for node in ast.walk(statement):
+        match node:
+            case ast.ClassDef(bases=bases):
+                yield from (b.id for b in bases if isinstance(b, ast.Name))
+            case ast.AnnAssign(annotation=annotation):
+                yield from select_annotation_names(annotation)
+            case ast.Assign(value=value):
+                yield from select_annotation_names(value)
+
+
+def make_template_id(name: str) -> str:
+    return f"_{name}"
+
+
+def make_template(statement: ast.stmt | ast.expr) -> ast.stmt | ast.expr:
+    match statement:
+        case ast.ClassDef(name=name):
+            template = copy.copy(statement)
+            template.name = make_template_id(name)
+            return template
+        case _:
+            return statement
+
+
+def make_template_subclass(statement: ast.stmt | ast.expr) -> ast.stmt | ast.expr:
+    # The subclass takes the fields of the shared template, the base classes of the
+    # version module come first so its run-time helpers are used. The docstring and
+    # class attributes (looked up in the class '__dict__') refer to the template's
+    match statement:
+        case ast.ClassDef(name=name, bases=bases, body=[docstring, *body]):
+            template = make_template_id(name)
+            return ast.ClassDef(
+                name,
+                bases=[*bases, ast.Name(template)],
+                body=[
+                    docstring,
+                    *(
+                        make_template_attribute(s, template)
+                        for s in body
+                        if isinstance(s, ast.Assign)
+                    ),
+                ],
+                decorator_list=[],
+                keywords=[],
+                type_params=[],
+            )
+        case _:
+            return statement
+
+
+def make_template_attribute(statement: ast.Assign, template: str) -> ast.stmt:
+    match statement:
+        case ast.Assign(targets=[ast.Name(id=name)]):
+            return ast.Assign(
+                targets=[ast.Name(name)],
+                value=ast.Attribute(value=ast.Name(template), attr=name),
+            )
+        case _:
+            return statement
+
+
+def build_shared_ast(
+    versions: Mapping[str, Iterable[StructureDefinition]],
+    shared_module: str = "shared",
+    sparse: bool = False,
+    intern: bool = False,
+    resource_union: bool = False,
+) -> tuple[list[ast.stmt | ast.expr], dict[str, list[ast.stmt | ast.expr]]]:
+    definitions: dict[str, dict[str, list[ast.stmt | ast.expr]]] = {}
+    for version, structure_definitions in versions.items():
+        definitions[version] = {}
+        for name, statements in define_definitions(
+            structure_definitions, sparse=sparse, intern=intern
+        ):
+            definitions[version].setdefault(name, []).extend(statements)
+
+    if not definitions:
+        return [], {}
+
+    first, *rest = definitions.values()
+    identical = {
+        name
+        for name, statements in first.items()
+        if all(
+            [ast.dump(s) for s in statements]
+            == [ast.dump(s) for s in other.get(name, [])]
+            for other in rest
+        )
+    }
+    defined = set(itertools.chain.from_iterable(definitions.values()))
+    references = {
+        name: set(
+            itertools.chain.from_iterable(
+                select_referenced_names(s) for s in first[name]
+            )
+        )
+        for name in identical
+    }
+    shared = set(identical)
+
+    # A definition can be shared only if everything it refers to is shared as well,
+    # forward references are resolved within the module the class is defined in.
+    # 'AnyResource' is resolved in run-time against the module resources,
+    # so definitions referring to it always stay in the version module.
+    while unresolved := {
+        name
+        for name in shared
+        if any(
+            ref == "AnyResource" or (ref in defined and ref not in shared)
+            for ref in references[name]
+        )
+    }:
+        shared -= unresolved
+
+    # Identical classes referring to version-specific definitions (e.g. every data type
+    # refers to Extension through its 'extension' element) are written to the shared
+    # module as templates under a private name, so their forward references are not
+    # resolved there. Version modules subclass them and the fields are resolved within
+    # the version module. 'AnyResource' is resolved by the base class in the shared
+    # module, so resources referring to it are not shared at all.
+    templates = {
+        name
+        for name in identical - shared
+        if isinstance(first[name][0], ast.ClassDef)
+        and "AnyResource" not in references[name]
+    }
+
+    # A shared module holding primitive aliases only saves less than importing its header
+    if not any(
+        isinstance(statement, ast.ClassDef)
+        for name in shared | templates
+        for statement in first[name]
+    ):
+        shared = set()
+        templates = set()
+
+    shared_ast: list[ast.stmt | ast.expr] = []
+    for name, statements in first.items():
+        if name in shared:
+            shared_ast.extend(statements)
+        elif name in templates:
+            shared_ast.extend(make_template(statement) for statement in statements)
+    version_names = sorted(
+        set(itertools.chain.from_iterable(references[name] for name in templates))
+        & (defined - shared)
+    )
+    if version_names:
+        # Type checkers see the fields of the templates typed by the names that are
+        # resolved by the version modules as Any
+        shared_ast.append(
+            ast.If(
+                test=ast.Name("TYPE_CHECKING"),
+                body=[
+                    ast.Assign(targets=[ast.Name(name)], value=ast.Name("Any_"))
+                    for name in version_names
+                ],
+                orelse=[],
+            )
+        )
+
+    imported = sorted(shared | {make_template_id(name) for name in templates})
+    versions_ast: dict[str, list[ast.stmt | ast.expr]] = {}
+    for version, version_definitions in definitions.items():
+        versions_ast[version] = [
+            *(
+                [
+                    ast.ImportFrom(
+                        module=shared_module,
+                        names=[ast.alias(name) for name in imported],
+                        level=1,
+                    )
+                ]
+                if imported
+                else []
+            ),
+            *define_options(resource_union=resource_union),
+            *itertools.chain.from_iterable(
+                (
+                    [make_template_subclass(s) for s in statements]
+                    if name in templates
+                    else statements
+                )
+                for name, statements in version_definitions.items()
+                if name not in shared
+            ),
+        ]
+
+    return shared_ast, versions_ast
@@ -3,15 +3,67 @@ import ast
 import itertools
 import logging
 import os
+from collections.abc import Iterable
 
-from fhir_py_types.ast import build_ast
-from fhir_py_types.reader.bundle import load_from_bundle
+from fhir_py_types import StructureDefinition
+from fhir_py_types.ast import build_ast, build_shared_ast, build_stub_ast
+from fhir_py_types.reader.bundle import StringTable, load_from_bundle
+from fhir_py_types.reader.package import load_from_package
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 
+SHARED_MODULE_NAME = "shared"
+
+
+def write_module(
+    outfile: str, ast_: Iterable[ast.stmt | ast.expr], header: str = "header.py.tpl"
+) -> None:
+    with open(os.path.join(dir_path, header)) as header_file:
+        header_lines = header_file.readlines()
+
+    with open(os.path.abspath(outfile), "w") as resource_file:
+        resource_file.writelines(
+            [
+                *header_lines,
+                "\n\n",
+                "\n\n\n".join(
+                    ast.unparse(ast.fix_missing_locations(tree)) for tree in ast_
+                ),
+            ]
+        )
+
+
+def write_stub(outfile: str, ast_: Iterable[ast.stmt | ast.expr]) -> None:
+    # Type checkers prefer the stub next to the module and skip the implementation
+    write_module(
+        os.path.splitext(outfile)[0] + ".pyi", build_stub_ast(ast_), "header.pyi.tpl"
+    )
+
+
+def load_from_path(
+    path: str, strings: StringTable | None = None
+) -> Iterable[StructureDefinition]:
+    if path.endswith((".tgz", ".tar.gz")):
+        return load_from_package(path, strings)
+    return load_from_bundle(path, strings)
+
+
+def parse_version_paths(
+    argparser: argparse.ArgumentParser, from_version: list[str]
+) -> dict[str, list[str]]:
+    versions: dict[str, list[str]] = {}
+    for value in from_version:
+        version, _, path = value.partition("=")
+        if not version.isidentifier() or not path:
+            argparser.error(f"--from-version expects VERSION=PATH, got '{value}'")
+        if version == SHARED_MODULE_NAME:
+            argparser.error(f"'{SHARED_MODULE_NAME}' is reserved for the shared module")
+        versions.setdefault(version, []).append(path)
+    return versions
+
 
 def main() -> None:
     argparser = argparse.ArgumentParser(
@@ -20,36 +72,121 @@ def main() -> None:
     argparser.add_argument(
         "--from-bundles",
         action="append",
-        required=True,
         help="File path to read 'StructureDefinition' resources from (repeat to read multiple files)",
     )
+    argparser.add_argument(
+        "--from-package",
+        action="append",
+        help="File path to read 'StructureDefinition' resources from FHIR NPM package (.tgz) "
+        "(repeat to read multiple packages)",
+    )
     argparser.add_argument(
         "--outfile",
-        required=True,
         help="File path to write generated Python typed data models to",
     )
+    argparser.add_argument(
+        "--from-version",
+        action="append",
+        metavar="VERSION=PATH",
+        help="Multi-version mode: bundle or FHIR NPM package (.tgz) file path "
+        "to read 'StructureDefinition' resources of the given version from "
+        "(repeat to read multiple files and versions). Definitions identical across all versions "
+        "are written once to a shared module",
+    )
+    argparser.add_argument(
+        "--outdir",
+        help="Directory to write the shared and per-version modules to in multi-version mode",
+    )
+    argparser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="Generate models that do not store unset optional fields per instance (saves memory)",
+    )
+    argparser.add_argument(
+        "--intern",
+        action="store_true",
+        help="Generate models that share one string object per distinct uri, code, canonical and id value "
+        "(saves memory, see intern_table)",
+    )
+    argparser.add_argument(
+        "--resource-union",
+        action="store_true",
+        help="Generate models that validate fields typed by any resource (Bundle.entry.resource, "
+        "contained) as a union of the resource models discriminated by resourceType, "
+        "picked by pydantic-core instead of a python validator (see README before using it)",
+    )
+    argparser.add_argument(
+        "--stubs",
+        action="store_true",
+        help="Write .pyi stubs with the class and field declarations only next to the modules, "
+        "type checkers use them instead of the implementation",
+    )
     argparser.add_argument(
         "--base-model",
         default="pydantic.BaseModel",
         help="Python path to the Base Model class to use as the base class for generated models",
     )
     args = argparser.parse_args()
+    # Strings repeated across all the loaded definitions are stored once
+    strings: StringTable = {}
+
+    if args.from_version:
+        if args.from_bundles or args.from_package or args.outfile or not args.outdir:
+            argparser.error(
+                "--from-version cannot be combined with --from-bundles, --from-package "
+                "or --outfile and requires --outdir"
+            )
 
-    ast_ = build_ast(
-        itertools.chain.from_iterable(
-            load_from_bundle(bundle) for bundle in args.from_bundles
+        versions = parse_version_paths(argparser, args.from_version)
+        shared_ast, versions_ast = build_shared_ast(
+            {
+                version: itertools.chain.from_iterable(
+                    load_from_path(path, strings) for path in paths
+                )
+                for version, paths in versions.items()
+            },
+            shared_module=SHARED_MODULE_NAME,
+            sparse=args.sparse,
+            intern=args.intern,
+            resource_union=args.resource_union,
         )
-    )
-    with open(os.path.join(dir_path, "header.py.tpl")) as header_file:
-        header_lines = header_file.readlines()
 
-    with open(os.path.abspath(args.outfile), "w") as resource_file:
-        resource_file.writelines(
-            [
-                *header_lines,
-                "\n\n",
-                "\n\n\n".join(
-                    ast.unparse(ast.fix_missing_locations(tree)) for tree in ast_
+        if not shared_ast:
+            logger.warning(
+                "No data types are identical across all versions, "
+                "writing complete per-version modules"
+            )
+
+        os.makedirs(args.outdir, exist_ok=True)
+        for name, ast_ in [
+            *([(SHARED_MODULE_NAME, shared_ast)] if shared_ast else []),
+            *versions_ast.items(),
+        ]:
+            write_module(os.path.join(args.outdir, f"{name}.py"), ast_)
+            if args.stubs:
+                write_stub(os.path.join(args.outdir, f"{name}.py"), ast_)
+        return
+
+    if not (args.from_bundles or args.from_package) or not args.outfile:
+        argparser.error("--from-bundles or --from-package and --outfile are required")
+
+    ast_ = list(
+        build_ast(
+            itertools.chain(
+                itertools.chain.from_iterable(
+                    load_from_bundle(bundle, strings)
+                    for bundle in args.from_bundles or []
                 ),
-            ]
+                itertools.chain.from_iterable(
+                    load_from_package(package, strings)
+                    for package in args.from_package or []
+                ),
+            ),
+            sparse=args.sparse,
+            intern=args.intern,
+            resource_union=args.resource_union,
         )
+    )
+    write_module(args.outfile, ast_)
+    if args.stubs:
+        write_stub(args.outfile, ast_)
@@ -1,21 +1,58 @@
+import array
+import csv
+import functools
+import hashlib
+import json
+import re
+import sys
+import threading
+
 from typing import (
+    IO as IO_,
+    Annotated as Annotated_,
+    Iterable as Iterable_,
+    Callable as Callable_,
+    NamedTuple as NamedTuple_,
+    Generator as Generator_,
     List as List_,
     Optional as Optional_,
     Literal as Literal_,
     Any as Any_,
+    Sequence as Sequence_,
+    Union as Union_,
+    TYPE_CHECKING,
 )
 
 from pydantic import (
+    AfterValidator,
     BaseModel as BaseModel_,
     ConfigDict,
     Field,
     SerializationInfo,
-    field_validator,
     field_serializer,
+    model_validator,
+    GetCoreSchemaHandler,
+    ValidatorFunctionWrapHandler,
     ValidationError,
+    ValidationInfo,
 )
 from pydantic.main import IncEx
-from pydantic_core import PydanticCustomError
+from pydantic_core import PydanticCustomError, core_schema, to_json
+
+
+class ElementInfo(NamedTuple_):
+    # Metadata of model fields listed in '__elements__' of every model
+    # e.g. Observation.__elements__["valueQuantity"]
+    element: str  # Element name, choice elements end with [x] (value[x])
+    type: str  # FHIR type code or the model name of backbone elements
+    alias: str  # JSON property name (valueQuantity, _status)
+    isarray: bool
+    required: bool
+
+
+# Fields typed by any resource validate a union of the resource models discriminated
+# by resourceType in models generated with `resource_union=True`
+RESOURCE_UNION = False
 
 
 class AnyResource(BaseModel_):
@@ -24,6 +61,42 @@ class AnyResource(BaseModel_):
     resourceType: str
     id: Optional_[str] = None
 
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any_, handler: GetCoreSchemaHandler, /
+    ) -> core_schema.CoreSchema:
+        if RESOURCE_UNION and cls is AnyResource:
+            # Fields typed as AnyResource are validated by pydantic-core straight from
+            # the input, resource models subclass AnyResource and build their own schema
+            return handler.generate_schema(
+                Annotated_[
+                    Union_[tuple(_select_resource_models())],
+                    Field(discriminator="resourceType"),
+                ]
+            )
+        return super().__get_pydantic_core_schema__(source, handler)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def validate_resource_type(
+        cls, value: Any_, handler: ValidatorFunctionWrapHandler, info: ValidationInfo
+    ):
+        # Fields typed as AnyResource are validated by the model of the actual resourceType
+        # straight from the input, it's the same for python and JSON (model_validate_json) input
+        if (
+            cls is not AnyResource
+            or not isinstance(value, dict)
+            or not isinstance(value.get("resourceType"), str)
+        ):
+            # Resource models, model instances and invalid input are handled as is
+            return handler(value)
+        return _validate_resource(value, info)
+
+    def model_dump_summary(self, **kwargs: Any_):
+        # _summary=true output: elements marked as isSummary listed in '__summary__'
+        # of the resource model, everything is dumped if definitions don't mark any
+        return self.model_dump(include=getattr(self, "__summary__", None), **kwargs)
+
 
 class BaseModel(BaseModel_):
     model_config = ConfigDict(
@@ -69,28 +142,852 @@ class BaseModel(BaseModel_):
             serialize_as_any=serialize_as_any,
         )
 
+    @classmethod
+    def model_rebuild(
+        cls,
+        *,
+        force: bool = False,
+        raise_errors: bool = True,
+        _parent_namespace_depth: int = 2,
+        _types_namespace: Optional_[dict[str, Any_]] = None,
+    ) -> Optional_[bool]:
+        # Deferred schemas are built on the first use, threads using a model for the first
+        # time at once wait for the one building it and then find the model complete
+        if _types_namespace is None and cls.__module__ not in sys.modules:
+            # Modules built in-process might be evicted from sys.modules while in use,
+            # forward references are then resolved within this module
+            _types_namespace = globals()
+        with _build_lock:
+            return super().model_rebuild(
+                force=force,
+                raise_errors=raise_errors,
+                _parent_namespace_depth=_parent_namespace_depth + 1,
+                _types_namespace=_types_namespace,
+            )
+
+    def fingerprint(self, ignore_meta_version: bool = False) -> str:
+        # Stable hash of the model content computed from the fields in declaration order,
+        # equal content gives equal hashes regardless of the input form (aliases, numbers format).
+        # The result is cached for frozen models only: in-place changes of the lists of
+        # mutable models can't be detected
+        frozen = self.model_config.get("frozen")
+        cached = self.__dict__.get("__fingerprint__") if frozen else None
+        if cached is not None and cached[0] == (id(self), ignore_meta_version):
+            return cached[1]
+
+        parts: List_[str] = []
+        _fingerprint_model(self, parts, ignore_meta_version)
+        digest = hashlib.blake2b(
+            "".join(parts).encode(), digest_size=16
+        ).hexdigest()
+        if frozen:
+            self.__dict__["__fingerprint__"] = ((id(self), ignore_meta_version), digest)
+        return digest
+
     @field_serializer("*")
     @classmethod
     def serialize_all_fields(cls, value: Any_, info: SerializationInfo):
         if isinstance(value, list):
-            return [_serialize(v, info) for v in value]
+            if info.include is None and info.exclude is None:
+                return [_serialize(v, info, None, None) for v in value]
+            return _serialize_items(value, info)
+
+        return _serialize(value, info, info.include, info.exclude)
+
+
+class SparseBaseModel(BaseModel):
+    # Optional fields that are not set (None) are not stored in the instance dict
+    # and read as None, it saves memory as most of the optional fields are usually empty.
+    # The output of model_dump is the same as for BaseModel, with exclude_none=False
+    # the fields that are not stored are dumped as None
+
+    def model_post_init(self, __context: Any_) -> None:
+        object.__setattr__(
+            self,
+            "__dict__",
+            {name: value for name, value in self.__dict__.items() if value is not None},
+        )
+
+    def __setattr__(self, name: str, value: Any_) -> None:
+        super().__setattr__(name, value)
+        if value is None and name in self.__class__.model_fields:
+            self.__dict__.pop(name, None)
+
+    def model_dump(
+        self,
+        *,
+        mode: Literal_["json", "python"] | str = "python",
+        include: IncEx | None = None,
+        exclude: IncEx | None = None,
+        context: Any_ | None = None,
+        by_alias: bool = True,
+        exclude_unset: bool = False,
+        exclude_defaults: bool = False,
+        exclude_none: bool = True,
+        round_trip: bool = False,
+        warnings: bool | Literal_["none", "warn", "error"] = True,
+        serialize_as_any: bool = False,
+    ):
+        # Nested models are dumped by this method as well (see serialize_all_fields)
+        data = super().model_dump(
+            mode=mode,
+            include=include,  # type: ignore
+            exclude=exclude,  # type: ignore
+            context=context,
+            by_alias=by_alias,
+            exclude_unset=exclude_unset,
+            exclude_defaults=exclude_defaults,
+            exclude_none=exclude_none,
+            round_trip=round_trip,
+            warnings=warnings,
+            serialize_as_any=serialize_as_any,
+        )
+        if exclude_none or exclude_defaults:
+            return data
+        return _restore_unset_fields(self, data, include, exclude, by_alias, exclude_unset)
+
+    def model_dump_json(
+        self,
+        *,
+        indent: int | None = None,
+        include: IncEx | None = None,
+        exclude: IncEx | None = None,
+        context: Any_ | None = None,
+        by_alias: bool = False,
+        exclude_unset: bool = False,
+        exclude_defaults: bool = False,
+        exclude_none: bool = False,
+        round_trip: bool = False,
+        warnings: bool | Literal_["none", "warn", "error"] = True,
+        serialize_as_any: bool = False,
+    ) -> str:
+        kwargs = dict(
+            include=include,
+            exclude=exclude,
+            context=context,
+            by_alias=by_alias,
+            exclude_unset=exclude_unset,
+            exclude_defaults=exclude_defaults,
+            exclude_none=exclude_none,
+            round_trip=round_trip,
+            warnings=warnings,
+            serialize_as_any=serialize_as_any,
+        )
+        if exclude_none or exclude_defaults:
+            return super().model_dump_json(indent=indent, **kwargs)  # type: ignore
+        # Encoded by pydantic the same way as the model itself
+        return to_json(self.model_dump(mode="json", **kwargs), indent=indent).decode()  # type: ignore
+
+    if not TYPE_CHECKING:
+        # Hidden from type checkers, otherwise any attribute access is considered valid
+        def __getattr__(self, name: str) -> Any_:
+            if name in self.__class__.model_fields:
+                return None
+            return super().__getattr__(name)
+
+
+class BundleIndex:
+    # Bundle entry resources by 'fullUrl' and by relative 'resourceType/id' reference
+    def __init__(self, entries: Optional_[List_[Any_]]):
+        self.resources: dict[str, Any_] = {}
+        for entry in entries or []:
+            resource = entry.resource
+            if resource is None:
+                continue
+            if entry.fullUrl is not None:
+                self.resources.setdefault(entry.fullUrl, resource)
+            if resource.id is not None:
+                self.resources.setdefault(
+                    f"{resource.resourceType}/{resource.id}", resource
+                )
+
+    def resolve(self, reference: Any_, target_types: Optional_[Sequence_[str]] = None):
+        # Reference might be passed either as Reference model or its 'reference' string.
+        # Allowed target types of a Reference property are listed in '__reference_targets__'
+        # of the referring model, e.g. Observation.__reference_targets__["subject"]
+        if not isinstance(reference, str):
+            reference = reference.reference
+        if reference is None or reference.startswith("#"):
+            # Contained resources are resolved within the referring resource
+            return None
+
+        resource = self.resources.get(reference.split("/_history/")[0])
+        if (
+            resource is not None
+            and target_types
+            and "Resource" not in target_types
+            and resource.resourceType not in target_types
+        ):
+            raise ValueError(
+                f"Reference {reference} resolves to {resource.resourceType}, "
+                f"expected one of: {', '.join(target_types)}"
+            )
+        return resource
+
+
+class BundleMixin:
+    def index(self) -> BundleIndex:
+        # Snapshot of the current entries built once to resolve many references in O(1),
+        # changes of the entries made afterwards are not reflected and need a new index
+        return BundleIndex(getattr(self, "entry", None))
+
+
+class InternStats(NamedTuple_):
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class InternTable:
+    # Values of uri, code, canonical and id elements validated by models generated
+    # with --intern share one string object per distinct value. The table is bounded:
+    # once it's full, new values are passed through as they are, frequent values
+    # (systems, codes, resource types) are usually the ones seen first
+    def __init__(self, maxsize: int = 1 << 16):
+        self.maxsize = maxsize
+        self.strings: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, value: str) -> str:
+        interned = self.strings.get(value)
+        if interned is not None:
+            self.hits += 1
+            return interned
+        self.misses += 1
+        if len(self.strings) < self.maxsize:
+            self.strings[value] = value
+        return value
+
+    def stats(self) -> InternStats:
+        return InternStats(self.hits, self.misses, len(self.strings), self.maxsize)
+
+    def clear(self):
+        self.strings.clear()
+        self.hits = self.misses = 0
+
+
+intern_table = InternTable()
+
+
+# Building a schema might build the schemas of the models it refers to
+_build_lock = threading.RLock()
+
+_META_VERSION_FIELDS = {"versionId", "versionId__ext", "lastUpdated", "lastUpdated__ext"}
+
+
+def _fingerprint_model(model: Any_, parts: List_[str], ignore_meta_version: bool):
+    is_resource = "resourceType" in type(model).model_fields
+    parts.append("{")
+    for name in type(model).model_fields:
+        value = getattr(model, name)
+        if value is None:
+            continue
+        if is_resource and ignore_meta_version and name == "meta":
+            meta_fields = [
+                n for n in type(value).model_fields if n not in _META_VERSION_FIELDS
+            ]
+            if all(getattr(value, n) is None for n in meta_fields):
+                continue
+            parts.append(f"{len(name)}:{name}{{")
+            for meta_name in meta_fields:
+                meta_value = getattr(value, meta_name)
+                if meta_value is not None:
+                    parts.append(f"{len(meta_name)}:{meta_name}")
+                    _fingerprint_value(meta_value, parts, ignore_meta_version)
+            parts.append("}")
+            continue
+        parts.append(f"{len(name)}:{name}")
+        _fingerprint_value(value, parts, ignore_meta_version)
+    for name, value in sorted((model.model_extra or {}).items()):
+        if value is not None:
+            parts.append(f"{len(name)}:{name}")
+            _fingerprint_value(value, parts, ignore_meta_version)
+    parts.append("}")
+
+
+def _fingerprint_value(value: Any_, parts: List_[str], ignore_meta_version: bool):
+    # Values are tagged and strings are length prefixed, so different content can't be
+    # encoded the same way. Nested resources are included by their own (cached) fingerprint
+    if isinstance(value, str):
+        parts.append(f"s{len(value)}:{value}")
+    elif isinstance(value, bool):
+        parts.append("t" if value else "f")
+    elif isinstance(value, (int, float)):
+        parts.append(f"n{value!r};")
+    elif isinstance(value, list):
+        parts.append("[")
+        for item in value:
+            _fingerprint_value(item, parts, ignore_meta_version)
+        parts.append("]")
+    elif isinstance(value, BaseModel) and "resourceType" in type(value).model_fields:
+        parts.append(f"r{value.fingerprint(ignore_meta_version)}")
+    elif isinstance(value, BaseModel_):
+        _fingerprint_model(value, parts, ignore_meta_version)
+    elif isinstance(value, dict):
+        parts.append("{")
+        for key, item in sorted(value.items()):
+            parts.append(f"{len(key)}:{key}")
+            _fingerprint_value(item, parts, ignore_meta_version)
+        parts.append("}")
+    else:
+        parts.append(f"o{value!r};")
+
+
+@functools.lru_cache(maxsize=None)
+def compile_path(path: str) -> Callable_[[Any_], List_[Any_]]:
+    # Returns accessor of the values on FHIRPath-like path (e.g. Observation.value[x],
+    # Patient.name.given) as a flat list. Element names are matched by FHIR name,
+    # choice elements also by the name without [x] and by the JSON property name
+    klass, _ = _path_elements(path)
+    segments = path.split(".")[1:]
+
+    def access(instance: Any_) -> List_[Any_]:
+        if not isinstance(instance, klass):
+            return []
+        values: List_[Any_] = [instance]
+        for segment in segments:
+            selected: List_[Any_] = []
+            for value in values:
+                for name in _element_fields(value.__class__, segment):
+                    item = getattr(value, name)
+                    if item is None:
+                        continue
+                    if isinstance(item, list):
+                        selected.extend(item)
+                    else:
+                        selected.append(item)
+            values = selected
+        return values
 
-        return _serialize(value, info)
+    return access
+
+
+def _path_elements(path: str) -> tuple[Any_, List_[List_[ElementInfo]]]:
+    # Validate the path against the model types while they are known statically
+    # and return the elements matched by every segment, fields typed by any resource
+    # are resolved by their actual type in run-time, so the rest is not listed
+    resource_type, *segments = path.split(".")
+    klass = globals().get(resource_type)
+    if not isinstance(klass, type) or "__elements__" not in klass.__dict__:
+        raise ValueError(f"{resource_type} is not a model")
+
+    models: List_[Any_] = [klass]
+    elements: List_[List_[ElementInfo]] = []
+    for segment in segments:
+        names = [(model, _element_fields(model, segment)) for model in models]
+        if not any(fields for _, fields in names):
+            raise ValueError(f"Path {path} is not found, no {segment} element")
+        elements.append(
+            [model.__elements__[name] for model, fields in names for name in fields]
+        )
+        types = {info.type for info in elements[-1]}
+        if "Resource" in types:
+            break
+        models = [
+            globals()[type_]
+            for type_ in types
+            if isinstance(globals().get(type_), type)
+            and "__elements__" in globals()[type_].__dict__
+        ]
+    return klass, elements
+
+
+@functools.lru_cache(maxsize=None)
+def _element_fields(model: Any_, segment: str) -> tuple[str, ...]:
+    elements = model.__dict__.get("__elements__", {})
+    return tuple(
+        name
+        for name, info in elements.items()
+        if info.alias == segment
+        or (
+            not info.alias.startswith("_")
+            and info.element in (segment, f"{segment}[x]")
+        )
+    )
+
+
+class ColumnInfo(NamedTuple_):
+    path: str  # Element path relative to the resource (e.g. valueQuantity.value)
+    type: Optional_[str]  # FHIR type code, None for choice elements of several types
+    repeated: bool  # Any element on the path is an array, values are stored as lists
+    nullable: bool  # Any element on the path is optional
+    typecode: Optional_[str]  # Typecode of numeric columns stored in arrays
+
+
+# Single numeric values are stored in array buffers instead of lists
+_COLUMN_TYPECODES = {
+    "decimal": "d",
+    "float": "d",
+    "integer": "q",
+    "positiveInt": "q",
+    "unsignedInt": "q",
+    "int": "q",
+    "boolean": "b",
+    "bool": "b",
+}
+
+_COLUMNS_MAGIC = b"FHIRCOL1\n"
+
+
+class ColumnExporter:
+    # Batches values of element paths (e.g. status, code.coding.code) of many resources
+    # of one type into per-column buffers. Numeric columns are arrays with a null mask
+    # (1 for missing values) when any element on the path is optional, other columns
+    # are lists with None for missing values, a list of values per resource for
+    # repeated elements and dumped dicts for complex values
+    def __init__(self, resource_type: str, paths: Sequence_[str]):
+        self.resource_type = resource_type
+        self.columns = [_column_info(resource_type, path) for path in paths]
+        self._model = globals()[resource_type]
+        self._accessors = [compile_path(f"{resource_type}.{path}") for path in paths]
+        self.clear()
+
+    def clear(self) -> None:
+        self.size = 0
+        self.data: dict[str, Any_] = {
+            c.path: array.array(c.typecode) if c.typecode else [] for c in self.columns
+        }
+        self.nulls: dict[str, bytearray] = {
+            c.path: bytearray() for c in self.columns if c.typecode and c.nullable
+        }
+
+    def extend(self, resources: Iterable_[Any_]):
+        batch = list(resources)
+        for resource in batch:
+            if not isinstance(resource, self._model):
+                raise ValueError(
+                    f"Expected {self.resource_type}, got {resource.__class__.__name__}"
+                )
+
+        # Columns are filled one by one, so the per-column state stays local to the loop
+        for column, access in zip(self.columns, self._accessors):
+            data = self.data[column.path]
+            nulls = self.nulls.get(column.path)
+            if column.repeated:
+                data.extend(
+                    [_column_value(value) for value in access(resource)]
+                    for resource in batch
+                )
+            elif nulls is not None:
+                for resource in batch:
+                    values = access(resource)
+                    data.append(values[0] if values else 0)
+                    nulls.append(0 if values else 1)
+            elif column.typecode:
+                data.extend(access(resource)[0] for resource in batch)
+            else:
+                for resource in batch:
+                    values = access(resource)
+                    data.append(_column_value(values[0]) if values else None)
+        self.size += len(batch)
+
+    def write_csv(self, fileobj: IO_[str]):
+        # Missing values are empty cells, booleans are written as true/false
+        # and repeated or complex values as JSON
+        writer = csv.writer(fileobj)
+        writer.writerow([column.path for column in self.columns])
+        writer.writerows(
+            zip(
+                *(
+                    _csv_cells(column, self.data[column.path], self.nulls.get(column.path))
+                    for column in self.columns
+                )
+            )
+        )
+
+    def write_columns(self, fileobj: IO_[bytes]):
+        # Local columnar format: magic line, JSON header line with the column metadata
+        # and offsets of the column blocks following it, arrays and null masks are
+        # stored as raw bytes in the writer byte order, list columns as JSON
+        blocks: List_[bytes] = []
+        columns: List_[dict[str, Any_]] = []
+        offset = 0
+        for column in self.columns:
+            data = self.data[column.path]
+            block = data.tobytes() if column.typecode else json.dumps(data).encode()
+            columns.append({**column._asdict(), "offset": offset, "length": len(block)})
+            blocks.append(block)
+            offset += len(block)
+            nulls = self.nulls.get(column.path)
+            if nulls is not None:
+                columns[-1]["nulls"] = [offset, len(nulls)]
+                blocks.append(bytes(nulls))
+                offset += len(nulls)
+
+        header = {
+            "resourceType": self.resource_type,
+            "size": self.size,
+            "byteorder": sys.byteorder,
+            "columns": columns,
+        }
+        fileobj.write(_COLUMNS_MAGIC)
+        fileobj.write(json.dumps(header).encode() + b"\n")
+        for block in blocks:
+            fileobj.write(block)
 
-    @field_validator("*")
     @classmethod
-    def validate_all_fields(cls, value: Any_):
-        if isinstance(value, list):
-            return [_validate(v, index=index) for index, v in enumerate(value)]
-        return _validate(value)
+    def read_columns(cls, fileobj: IO_[bytes]) -> "ColumnExporter":
+        if fileobj.readline() != _COLUMNS_MAGIC:
+            raise ValueError("Not a columns file")
+        header = json.loads(fileobj.readline())
+        body = fileobj.read()
+
+        exporter = cls(header["resourceType"], [c["path"] for c in header["columns"]])
+        exporter.size = header["size"]
+        for column in header["columns"]:
+            block = body[column["offset"] : column["offset"] + column["length"]]
+            if column["typecode"]:
+                data = array.array(column["typecode"], block)
+                if header["byteorder"] != sys.byteorder:
+                    data.byteswap()
+            else:
+                data = json.loads(block)
+            exporter.data[column["path"]] = data
+            if "nulls" in column:
+                start, length = column["nulls"]
+                exporter.nulls[column["path"]] = bytearray(body[start : start + length])
+        return exporter
+
+
+def _column_info(resource_type: str, path: str) -> ColumnInfo:
+    _, elements = _path_elements(f"{resource_type}.{path}")
+    # Elements past a resource typed field are known in run-time only
+    known = len(elements) == len(path.split("."))
+    types = {info.type for info in elements[-1]} if known else set()
+    type_ = types.pop() if len(types) == 1 else None
+    repeated = not known or any(info.isarray for infos in elements for info in infos)
+    nullable = not known or any(
+        len(infos) > 1 or not infos[0].required for infos in elements
+    )
+    typecode = None if repeated else _COLUMN_TYPECODES.get(type_ or "")
+    return ColumnInfo(path, type_, repeated, nullable, typecode)
+
+
+def _column_value(value: Any_):
+    return value.model_dump() if isinstance(value, BaseModel_) else value
+
+
+def _csv_cells(column: ColumnInfo, data: Any_, nulls: Optional_[bytearray]):
+    if column.typecode == "b":
+        data = [bool(value) for value in data]
+    if nulls is not None:
+        return ["" if null else _csv_cell(value) for value, null in zip(data, nulls)]
+    return [_csv_cell(value) for value in data]
+
+
+def _csv_cell(value: Any_):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def diff(old: Any_, new: Any_, path: str = "") -> List_[dict[str, Any_]]:
+    # RFC 6902 JSON Patch turning old model instance into the new one,
+    # models are compared field by field and subtrees shared by both instances are skipped
+    if old is new:
+        return []
+    if old is None:
+        return [{"op": "add", "path": path, "value": _dump(new)}]
+    if new is None:
+        return [{"op": "remove", "path": path}]
+
+    if isinstance(old, BaseModel_) and type(old) is type(new):
+        patch = []
+        for name, field in type(old).model_fields.items():
+            patch.extend(
+                diff(
+                    getattr(old, name),
+                    getattr(new, name),
+                    f"{path}/{_escape(field.alias or name)}",
+                )
+            )
+        for name in {**(old.model_extra or {}), **(new.model_extra or {})}:
+            patch.extend(
+                diff(
+                    (old.model_extra or {}).get(name),
+                    (new.model_extra or {}).get(name),
+                    f"{path}/{_escape(name)}",
+                )
+            )
+        return patch
+
+    if isinstance(old, list) and isinstance(new, list):
+        patch = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            patch.extend(diff(old_item, new_item, f"{path}/{index}"))
+        for index in range(len(old), len(new)):
+            patch.append(
+                {"op": "add", "path": f"{path}/{index}", "value": _dump(new[index])}
+            )
+        for index in reversed(range(len(new), len(old))):
+            patch.append({"op": "remove", "path": f"{path}/{index}"})
+        return patch
+
+    if type(old) is type(new) and old == new:
+        return []
+    return [{"op": "replace", "path": path, "value": _dump(new)}]
+
+
+def apply_patch(model: Any_, patch: Sequence_[dict[str, Any_]]):
+    # Applies RFC 6902 JSON Patch in place, only the fields on the patched paths are
+    # assigned and so revalidated (validate_assignment), the rest of the resource is not
+    for operation in patch:
+        op = operation["op"]
+        if op in ("add", "replace"):
+            _patch_path(model, operation["path"], op, operation["value"])
+        elif op == "remove":
+            _patch_path(model, operation["path"], op)
+        elif op == "copy":
+            value = _dump(_get_path(model, operation["from"]))
+            _patch_path(model, operation["path"], "add", value)
+        elif op == "move":
+            value = _get_path(model, operation["from"])
+            _patch_path(model, operation["from"], "remove")
+            _patch_path(model, operation["path"], "add", value)
+        elif op == "test":
+            value = _get_path(model, operation["path"])
+            if _dump(value) != operation["value"]:
+                raise ValueError(f"Test operation failed for {operation['path']}")
+        else:
+            raise ValueError(f"Unsupported patch operation {op}")
+    return model
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
 
 
-def _serialize(value: Any_, info: SerializationInfo):
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _dump(value: Any_):
+    if isinstance(value, BaseModel_):
+        return value.model_dump(mode="json", by_alias=True, exclude_none=True)
+    if isinstance(value, list):
+        return [_dump(v) for v in value]
+    return value
+
+
+def _field_name(model: Any_, token: str) -> str:
+    for name, field in type(model).model_fields.items():
+        if token in (name, field.alias):
+            return name
+    if type(model).model_config.get("extra") == "allow":
+        return token
+    raise ValueError(f"{type(model).__name__} has no field {token}")
+
+
+def _list_index(items: list, token: str, op: str) -> int:
+    if token == "-" and op == "add":
+        return len(items)
+    if not token.isdigit() or int(token) > len(items) - (op != "add"):
+        raise ValueError(f"List index {token} is out of range")
+    return int(token)
+
+
+def _get_path(model: Any_, path: str):
+    value = model
+    for token in map(_unescape, path.split("/")[1:]):
+        if isinstance(value, BaseModel_):
+            value = getattr(value, _field_name(value, token))
+        elif isinstance(value, list):
+            value = value[_list_index(value, token, "get")]
+        else:
+            raise ValueError(f"Path {path} is not found")
+    return value
+
+
+def _patch_path(model: Any_, path: str, op: str, value: Any_ = None):
+    tokens = [_unescape(token) for token in path.split("/")[1:]]
+    if not tokens:
+        raise ValueError("Patching the whole resource is not supported")
+
+    # FHIR lists are not nested, so a list is always owned by the last model field on the path
+    parent, owner, name = model, model, ""
+    for token in tokens[:-1]:
+        if isinstance(parent, BaseModel_):
+            owner, name = parent, _field_name(parent, token)
+            parent = getattr(parent, name)
+        elif isinstance(parent, list):
+            parent = parent[_list_index(parent, token, "get")]
+        else:
+            raise ValueError(f"Path {path} is not found")
+
+    if isinstance(parent, BaseModel_):
+        name = _field_name(parent, tokens[-1])
+        if op != "add" and getattr(parent, name) is None:
+            raise ValueError(f"Path {path} is not found")
+        setattr(parent, name, None if op == "remove" else value)
+    elif isinstance(parent, list):
+        # Only the touched field is assigned and so revalidated, existing items are kept as is
+        position = _list_index(parent, tokens[-1], op)
+        items = list(parent)
+        if op == "add":
+            items.insert(position, value)
+        elif op == "replace":
+            items[position] = value
+        else:
+            del items[position]
+        setattr(owner, name, items)
+    else:
+        raise ValueError(f"Path {path} is not found")
+
+
+def iter_bundle_entries(
+    fileobj: IO_[Any_], chunk_size: int = 1 << 16
+) -> Generator_["BundleEntry", None, "Bundle"]:
+    # Reads Bundle JSON from binary or text file object by chunks and yields validated entries
+    # one by one, so only the entry being validated (and the chunk) is kept in memory.
+    # The envelope (Bundle without entries) is validated once the document is read
+    # and returned from the generator, e.g. envelope = yield from iter_bundle_entries(f)
+    stream = _JsonStream(fileobj, chunk_size)
+    envelope: List_[bytes] = []
+    stream.expect(b"{")
+    members = 0
+    while stream.peek() != b"}":
+        if members:
+            stream.expect(b",")
+        members += 1
+        key = stream.value()
+        stream.expect(b":")
+        if json.loads(key) != "entry":
+            envelope.append(key + b":" + stream.value())
+            continue
+
+        stream.expect(b"[")
+        index = 0
+        while stream.peek() != b"]":
+            if index:
+                stream.expect(b",")
+            try:
+                yield globals()["BundleEntry"].model_validate_json(stream.value())
+            except ValidationError as exc:
+                raise ValidationError.from_exception_data(
+                    exc.title,
+                    [
+                        {**error, "loc": ("entry", index, *error["loc"])}  # type: ignore
+                        for error in exc.errors()
+                    ],
+                ) from exc
+            index += 1
+        stream.expect(b"]")
+    stream.expect(b"}")
+
+    return globals()["Bundle"].model_validate_json(b"{" + b",".join(envelope) + b"}")
+
+
+# Skips complete strings and any other bytes up to the next bracket or incomplete string
+_JSON_SKIP = re.compile(rb'(?:[^"\[\]{}]|"(?:[^"\\]|\\.)*+")*+')
+_JSON_STRING = re.compile(rb'"(?:[^"\\]|\\.)*+"')
+_JSON_SCALAR = re.compile(rb"[^\s,\]}]+")
+_JSON_WHITESPACE = re.compile(rb"\s*")
+
+
+class _JsonStream:
+    # Splits JSON read by chunks into raw values, the buffer is trimmed on every read
+    def __init__(self, fileobj: IO_[Any_], chunk_size: int):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.buffer = b""
+        self.pos = 0
+        self.offset = 0
+
+    def read(self) -> int:
+        chunk = self.fileobj.read(self.chunk_size)
+        if not chunk:
+            raise ValueError(f"Unexpected end of JSON at {self.offset + len(self.buffer)}")
+        shift = self.pos
+        self.buffer = self.buffer[shift:] + (
+            chunk.encode() if isinstance(chunk, str) else chunk
+        )
+        self.pos = 0
+        self.offset += shift
+        return shift
+
+    def peek(self) -> bytes:
+        while True:
+            match = _JSON_WHITESPACE.match(self.buffer, self.pos)
+            self.pos = match.end() if match else self.pos
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos : self.pos + 1]
+            self.read()
+
+    def expect(self, char: bytes) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char.decode()} at {self.offset + self.pos}")
+        self.pos += 1
+
+    def value(self) -> bytes:
+        char = self.peek()
+        if char in (b"{", b"["):
+            depth, scan = 0, self.pos
+            while True:
+                scan = _JSON_SKIP.match(self.buffer, scan).end()  # type: ignore
+                if scan == len(self.buffer) or self.buffer[scan] == 0x22:  # '"'
+                    # Incomplete string or no more brackets in the buffer
+                    scan -= self.read()
+                    continue
+                depth += 1 if self.buffer[scan] in b"{[" else -1
+                scan += 1
+                if depth == 0:
+                    return self._consume(scan)
+        if char == b'"':
+            match = _JSON_STRING.match(self.buffer, self.pos)
+            while match is None:
+                self.read()
+                match = _JSON_STRING.match(self.buffer, self.pos)
+            return self._consume(match.end())
+
+        match = _JSON_SCALAR.match(self.buffer, self.pos)
+        while match is not None and match.end() == len(self.buffer):
+            try:
+                self.read()
+            except ValueError:
+                break
+            match = _JSON_SCALAR.match(self.buffer, self.pos)
+        if match is None:
+            raise ValueError(f"Invalid JSON at {self.offset + self.pos}")
+        return self._consume(match.end())
+
+    def _consume(self, end: int) -> bytes:
+        value, self.pos = self.buffer[self.pos : end], end
+        return value
+
+
+def _serialize_items(value: list, info: SerializationInfo):
+    # Nested include and exclude of list fields are keyed by item index or '__all__'
+    items = []
+    for index, item in enumerate(value):
+        include = _item_filter(info.include, index)
+        exclude = _item_filter(info.exclude, index)
+        if (info.include is not None and include is None) or exclude is True:
+            continue
+        items.append(_serialize(item, info, include, exclude))
+    return items
+
+
+def _item_filter(filter_: Any_, index: int):
+    if isinstance(filter_, dict):
+        item_filter = filter_.get(index, filter_.get("__all__"))
+        return True if item_filter is ... else item_filter
+    if isinstance(filter_, set):
+        return True if index in filter_ or "__all__" in filter_ else None
+    return filter_
+
+
+def _serialize(value: Any_, info: SerializationInfo, include: Any_, exclude: Any_):
     # Custom serializer for AnyResource fields
     kwargs = {
         "mode": info.mode,
-        "include": info.include,
-        "exclude": info.exclude,
+        "include": None if include is True else include,
+        "exclude": exclude,
         "context": info.context,
         "by_alias": info.by_alias,
         "exclude_unset": info.exclude_unset,
@@ -106,57 +1003,83 @@ def _serialize(value: Any_, info: SerializationInfo):
     return value
 
 
-def _validate(value: Any_, index: int | None = None):
-    # Custom validator for AnyResource fields
-    if isinstance(value, AnyResource):
-        try:
-            klass = globals()[value.resourceType]
-        except KeyError as exc:
-            raise ValidationError.from_exception_data(
-                "ImportError",
-                [
-                    {
-                        "loc": (index, "resourceType")
-                        if index is not None
-                        else ("resourceType",),
-                        "type": "value_error",
-                        "input": [value],
-                        "ctx": {"error": f"{value.resourceType} resource is not found"},
-                    }
-                ],
-            ) from exc
-
-        if not issubclass(klass, BaseModel) or "resourceType" not in klass.model_fields:
-            raise ValidationError.from_exception_data(
-                "ImportError",
-                [
-                    {
-                        "loc": (index, "resourceType")
-                        if index is not None
-                        else ("resourceType",),
-                        "type": "value_error",
-                        "input": [value],
-                        "ctx": {"error": f"{value.resourceType} is not a resource"},
-                    }
-                ],
+def _restore_unset_fields(
+    model: Any_,
+    data: dict[str, Any_],
+    include: IncEx | None,
+    exclude: IncEx | None,
+    by_alias: bool,
+    exclude_unset: bool,
+) -> dict[str, Any_]:
+    # Fields of sparse models that are not stored are put back as None in declaration
+    # order, unless they are filtered out by include, exclude or exclude_unset
+    restored: dict[str, Any_] = {}
+    for name, field in model.__class__.model_fields.items():
+        key = field.alias or name if by_alias else name
+        if key in data:
+            restored[key] = data.pop(key)
+        elif (
+            name not in model.__dict__
+            and (include is None or name in include)
+            and not (
+                exclude is not None
+                and name in exclude
+                and (not isinstance(exclude, dict) or exclude[name] is True)
             )
+            and (not exclude_unset or name in model.model_fields_set)
+        ):
+            restored[key] = None
+    # Extra attributes follow the fields
+    restored.update(data)
+    return restored
+
+
+# Resource models by resourceType, resolved from the module namespace once
+_resource_models: dict[str, Any_] = {}
+
+
+def _select_resource_models() -> List_[Any_]:
+    return [
+        model
+        for model in globals().values()
+        if isinstance(model, type)
+        and issubclass(model, BaseModel)
+        and issubclass(model, AnyResource)
+    ]
+
 
-        try:
-            return klass(**value.model_dump())
-        except ValidationError as exc:
-            raise ValidationError.from_exception_data(
-                exc.title,
-                [
-                    {
-                        "loc": (index, *error["loc"])
-                        if index is not None
-                        else error["loc"],
-                        "type": error["type"],
-                        "input": error["input"],
-                        "ctx": error["ctx"]
-                    }
-                    for error in exc.errors()
-                ],
-            ) from exc
-
-    return value
\ No newline at end of file
+def _validate_resource(value: dict, info: ValidationInfo):
+    resource_type = value["resourceType"]
+    klass = _resource_models.get(resource_type)
+    if klass is None:
+        klass = _resolve_resource(value)
+        # Concurrent first lookups store the same model
+        _resource_models[resource_type] = klass
+    return klass.model_validate(value, context=info.context)
+
+
+def _resolve_resource(value: dict):
+    resource_type = value["resourceType"]
+    klass = globals().get(resource_type)
+    if klass is None:
+        error = f"{resource_type} resource is not found"
+    elif (
+        not isinstance(klass, type)
+        or not issubclass(klass, BaseModel)
+        or "resourceType" not in klass.model_fields
+    ):
+        error = f"{resource_type} is not a resource"
+    else:
+        return klass
+
+    raise ValidationError.from_exception_data(
+        "ImportError",
+        [
+            {
+                "loc": ("resourceType",),
+                "type": "value_error",
+                "input": value,
+                "ctx": {"error": error},
+            }
+        ],
+    )
@@ -0,0 +1,105 @@
+from typing import (
+    IO as IO_,
+    Annotated as Annotated_,
+    Iterable as Iterable_,
+    Callable as Callable_,
+    ClassVar as ClassVar_,
+    NamedTuple as NamedTuple_,
+    Generator as Generator_,
+    List as List_,
+    Optional as Optional_,
+    Literal as Literal_,
+    Any as Any_,
+    Sequence as Sequence_,
+)
+
+from pydantic import AfterValidator, BaseModel as BaseModel_, Field
+
+
+class ElementInfo(NamedTuple_):
+    element: str
+    type: str
+    alias: str
+    isarray: bool
+    required: bool
+
+
+class AnyResource(BaseModel_):
+    resourceType: str
+    id: Optional_[str] = None
+
+    def model_dump_summary(self, **kwargs: Any_) -> dict[str, Any_]: ...
+
+
+class BaseModel(BaseModel_):
+    def fingerprint(self, ignore_meta_version: bool = ...) -> str: ...
+
+
+class SparseBaseModel(BaseModel): ...
+
+
+class BundleIndex:
+    resources: dict[str, Any_]
+
+    def __init__(self, entries: Optional_[List_[Any_]]) -> None: ...
+    def resolve(
+        self, reference: Any_, target_types: Optional_[Sequence_[str]] = ...
+    ) -> Any_: ...
+
+
+class BundleMixin:
+    def index(self) -> BundleIndex: ...
+
+
+class InternStats(NamedTuple_):
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class InternTable:
+    maxsize: int
+    strings: dict[str, str]
+    hits: int
+    misses: int
+
+    def __init__(self, maxsize: int = ...) -> None: ...
+    def __call__(self, value: str) -> str: ...
+    def stats(self) -> InternStats: ...
+    def clear(self) -> None: ...
+
+
+intern_table: InternTable
+
+
+class ColumnInfo(NamedTuple_):
+    path: str
+    type: Optional_[str]
+    repeated: bool
+    nullable: bool
+    typecode: Optional_[str]
+
+
+class ColumnExporter:
+    resource_type: str
+    columns: List_[ColumnInfo]
+    size: int
+    data: dict[str, Any_]
+    nulls: dict[str, bytearray]
+
+    def __init__(self, resource_type: str, paths: Sequence_[str]) -> None: ...
+    def clear(self) -> None: ...
+    def extend(self, resources: Iterable_[Any_]) -> None: ...
+    def write_csv(self, fileobj: IO_[str]) -> None: ...
+    def write_columns(self, fileobj: IO_[bytes]) -> None: ...
+    @classmethod
+    def read_columns(cls, fileobj: IO_[bytes]) -> "ColumnExporter": ...
+
+
+def compile_path(path: str) -> Callable_[[Any_], List_[Any_]]: ...
+def diff(old: Any_, new: Any_, path: str = ...) -> List_[dict[str, Any_]]: ...
+def apply_patch(model: Any_, patch: Sequence_[dict[str, Any_]]) -> Any_: ...
+def iter_bundle_entries(
+    fileobj: IO_[Any_], chunk_size: int = ...
+) -> Generator_["BundleEntry", None, "Bundle"]: ...
@@ -0,0 +1,157 @@
+import ast
+import functools
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Future
+from types import ModuleType
+
+from fhir_py_types.ast import build_ast
+from fhir_py_types.reader.bundle import (
+    DefinitionsBundle,
+    StringTable,
+    read_structure_definitions,
+)
+
+HEADER_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "header.py.tpl")
+MODULE_NAME_PREFIX = "fhir_py_types.generated_"
+# Least recently requested modules beyond the limit are evicted from the cache
+MAX_CACHED_MODULES = 32
+
+_modules: OrderedDict[str, ModuleType] = OrderedDict()
+# Modules being built by name, concurrent requests of the same input wait for the result
+_building: dict[str, Future[ModuleType]] = {}
+_modules_lock = threading.Lock()
+
+
+@functools.cache
+def parse_header() -> ast.Module:
+    with open(HEADER_PATH) as header_file:
+        return ast.parse(header_file.read(), HEADER_PATH)
+
+
+def fill_expression_context(node: ast.AST) -> ast.stmt:
+    # Generated names are built without load/store context as unparse does not need it,
+    # assignment targets are visited before the rest of the names
+    for child in ast.walk(node):
+        match child:
+            case ast.AnnAssign() | ast.Assign():
+                targets = (
+                    [child.target]
+                    if isinstance(child, ast.AnnAssign)
+                    else child.targets
+                )
+                for target in targets:
+                    if not hasattr(target, "ctx"):
+                        target.ctx = ast.Store()  # type: ignore[attr-defined]
+            case ast.Name() | ast.Subscript() | ast.Tuple() if not hasattr(
+                child, "ctx"
+            ):
+                child.ctx = ast.Load()
+    return node if isinstance(node, ast.stmt) else ast.Expr(node)  # type: ignore[arg-type]
+
+
+def hash_bundles(
+    bundles: Iterable[DefinitionsBundle],
+    sparse: bool,
+    intern: bool,
+    resource_union: bool = False,
+) -> str:
+    digest = hashlib.sha256(
+        f"sparse={sparse},intern={intern},resource_union={resource_union}".encode()
+    )
+    for bundle in bundles:
+        digest.update(json.dumps(bundle, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def compile_module(
+    name: str,
+    bundles: list[DefinitionsBundle],
+    sparse: bool,
+    intern: bool,
+    resource_union: bool = False,
+) -> ModuleType:
+    strings: StringTable = {}
+    definitions = build_ast(
+        itertools.chain.from_iterable(
+            read_structure_definitions(bundle, strings) for bundle in bundles
+        ),
+        sparse=sparse,
+        intern=intern,
+        resource_union=resource_union,
+    )
+    tree = ast.Module(
+        body=[
+            *parse_header().body,
+            *(fill_expression_context(definition) for definition in definitions),
+        ],
+        type_ignores=[],
+    )
+    code = compile(ast.fix_missing_locations(tree), f"<{name}>", "exec")
+
+    module = ModuleType(name)
+    exec(code, module.__dict__)
+    return module
+
+
+def build_module(
+    bundles: Iterable[DefinitionsBundle],
+    sparse: bool = False,
+    intern: bool = False,
+    resource_union: bool = False,
+) -> ModuleType:
+    bundles = list(bundles)
+    name = (
+        MODULE_NAME_PREFIX + hash_bundles(bundles, sparse, intern, resource_union)[:32]
+    )
+    # Modules are cached by input hash and registered in sys.modules, where forward
+    # references of the generated models are resolved. The lock guards the cache only,
+    # modules are built outside of it: a module is built once and is never returned
+    # before it's executed, while requests of other inputs don't wait for the build
+    with _modules_lock:
+        module = _modules.get(name)
+        if module is not None:
+            _modules.move_to_end(name)
+            return module
+
+        building = _building.get(name)
+        owner = building is None
+        if building is None:
+            building = _building[name] = Future()
+
+    if not owner:
+        return building.result()
+
+    try:
+        module = compile_module(name, bundles, sparse, intern, resource_union)
+    except BaseException as error:
+        # Waiting requests get the error, the next request builds the module again
+        with _modules_lock:
+            del _building[name]
+        building.set_exception(error)
+        raise
+
+    with _modules_lock:
+        del _building[name]
+        _modules[name] = sys.modules[name] = module
+        while len(_modules) > MAX_CACHED_MODULES:
+            _evict(next(iter(_modules)))
+    building.set_result(module)
+    return module
+
+
+def evict_module(module: ModuleType) -> None:
+    # Evicted modules stay usable by those holding them (see BaseModel.model_rebuild)
+    with _modules_lock:
+        _evict(module.__name__)
+
+
+def _evict(name: str) -> None:
+    _modules.pop(name, None)
+    sys.modules.pop(name, None)
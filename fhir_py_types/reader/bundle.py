@@ -25,17 +25,29 @@ logger = logging.getLogger(__name__)
 
 DefinitionsBundle = dict[str, Any]
 
+# Strings repeated across definitions (ids, property keys, type codes, target profiles)
+# are deduplicated through a table scoped to the load. sys.intern is not used: interned
+# strings are immortal on Python 3.12 and would outlive the definitions. Docstrings are
+# mostly unique and are kept as they are
+StringTable = dict[str, str]
+
+
+def dedupe(strings: StringTable, value: str) -> str:
+    return strings.setdefault(value, value)
+
 
 def parse_type_identifier(type_: str) -> str:
     code = type_.split("/")[-1]
     return FHIR_TO_SYSTEM_TYPE_MAP.get(code, code)
 
 
-def parse_target_profile(target_profile: list[str]) -> list[str]:
+def parse_target_profile(
+    target_profile: list[str], strings: StringTable
+) -> tuple[str, ...]:
     profiles = [p.split("/")[-2:] for p in target_profile]
     if any(type_ != "StructureDefinition" for type_, _ in profiles):
         raise ValueError(f"Unknown target profile type: {target_profile}")
-    return [profile for _, profile in profiles]
+    return tuple(dedupe(strings, profile) for _, profile in profiles)
 
 
 def parse_resource_name(path: str) -> str:
@@ -59,12 +71,12 @@ def unwrap_schema_type(
 
 
 def parse_property_type(
-    schema: dict, kind: StructureDefinitionKind | None
+    schema: dict, kind: StructureDefinitionKind | None, strings: StringTable
 ) -> list[StructurePropertyType]:
     return [
         StructurePropertyType(
-            code=parse_type_identifier(type_),
-            target_profile=parse_target_profile(target_profile),
+            code=dedupe(strings, parse_type_identifier(type_)),
+            target_profile=parse_target_profile(target_profile, strings),
             required=schema["min"] != 0,
             isarray=schema["max"] != "1",
         )
@@ -72,10 +84,10 @@ def parse_property_type(
     ]
 
 
-def parse_property_key(schema: dict) -> str:
+def parse_property_key(schema: dict, strings: StringTable) -> str:
     property_key: str = schema["id"].split(".")[-1]
     # 'Choice of Types' are handled by property type, will not parse suffix
-    return property_key.removesuffix("[x]")
+    return dedupe(strings, property_key.removesuffix("[x]"))
 
 
 def parse_property_kind(schema: dict) -> StructureDefinitionKind | None:
@@ -86,7 +98,9 @@ def parse_property_kind(schema: dict) -> StructureDefinitionKind | None:
             return None
 
 
-def parse_base_structure_definition(definition: dict[str, Any]) -> StructureDefinition:
+def parse_base_structure_definition(
+    definition: dict[str, Any], strings: StringTable
+) -> StructureDefinition:
     kind = StructureDefinitionKind.from_str(definition["kind"])
     schemas = definition["snapshot"]["element"]
     base_schema = next(s for s in schemas if s["id"] == definition["type"])
@@ -104,30 +118,37 @@ def parse_base_structure_definition(definition: dict[str, Any]) -> StructureDefi
         case StructureDefinitionKind.RESOURCE:
             default_elements = {
                 "resourceType": StructureDefinition(
-                    id=definition["type"],
+                    id=dedupe(strings, definition["type"]),
                     docstring=base_schema["short"],
                     type=[
                         StructurePropertyType(
-                            code=definition["type"], required=True, literal=True
+                            code=dedupe(strings, definition["type"]),
+                            required=True,
+                            literal=True,
                         )
                     ],
                     elements={},
+                    summary=True,
                 )
             }
         case _:
             default_elements = {}
 
     return StructureDefinition(
-        id=definition["id"],
+        id=dedupe(strings, definition["id"]),
         kind=kind,
         docstring=base_schema["definition"],
-        type=parse_property_type(structure_schema, kind),
+        type=parse_property_type(structure_schema, kind, strings),
         elements=default_elements,
     )
 
 
-def parse_structure_definition(definition: dict[str, Any]) -> StructureDefinition:
-    structure_definition = parse_base_structure_definition(definition)
+def parse_structure_definition(
+    definition: dict[str, Any], strings: StringTable | None = None
+) -> StructureDefinition:
+    if strings is None:
+        strings = {}
+    structure_definition = parse_base_structure_definition(definition, strings)
     schemas = (
         e for e in definition["snapshot"]["element"] if e["id"] != definition["type"]
     )
@@ -137,15 +158,16 @@ def parse_structure_definition(definition: dict[str, Any]) -> StructureDefinitio
         for path_component in schema["path"].split(".")[1:-1]:
             subtree = subtree.elements[path_component]
 
-        property_key = parse_property_key(schema)
+        property_key = parse_property_key(schema, strings)
         property_kind = parse_property_kind(schema)
 
         subtree.elements[property_key] = StructureDefinition(
-            id=parse_resource_name(schema["id"]),
+            id=dedupe(strings, parse_resource_name(schema["id"])),
             docstring=schema["definition"],
-            type=parse_property_type(schema, property_kind),
+            type=parse_property_type(schema, property_kind, strings),
             kind=property_kind,
             elements={},
+            summary=schema.get("isSummary", False),
         )
 
     return structure_definition
@@ -162,13 +184,20 @@ def select_structure_definition_resources(
 
 
 def read_structure_definitions(
-    bundle: DefinitionsBundle,
+    bundle: DefinitionsBundle, strings: StringTable | None = None
 ) -> Iterable[StructureDefinition]:
     raw_definitions = select_structure_definition_resources(bundle)
+    if strings is None:
+        strings = {}
 
-    return (parse_structure_definition(definition) for definition in raw_definitions)
+    return (
+        parse_structure_definition(definition, strings)
+        for definition in raw_definitions
+    )
 
 
-def load_from_bundle(path: str) -> Iterable[StructureDefinition]:
+def load_from_bundle(
+    path: str, strings: StringTable | None = None
+) -> Iterable[StructureDefinition]:
     with open(os.path.abspath(path), encoding="utf8") as schema_file:
-        return read_structure_definitions(json.load(schema_file))
+        return read_structure_definitions(json.load(schema_file), strings)
@@ -0,0 +1,84 @@
+import json
+import os
+import posixpath
+import tarfile
+from collections.abc import Iterable
+from typing import Any
+
+from fhir_py_types import StructureDefinition
+from fhir_py_types.reader.bundle import StringTable, parse_structure_definition
+
+PACKAGE_DIRECTORY = "package"
+PACKAGE_INDEX = posixpath.join(PACKAGE_DIRECTORY, ".index.json")
+TYPE_DEFINITION_KINDS = {"primitive-type", "complex-type", "resource"}
+
+
+def parse_member_name(member: tarfile.TarInfo) -> str:
+    return posixpath.normpath(member.name.removeprefix("./"))
+
+
+def load_member(archive: tarfile.TarFile, member: tarfile.TarInfo) -> dict[str, Any]:
+    member_file = archive.extractfile(member)
+    if member_file is None:
+        raise ValueError(f"Package member {member.name} is not a regular file")
+    resource: dict[str, Any] = json.load(member_file)
+    return resource
+
+
+def is_type_definition(definition: dict[str, Any]) -> bool:
+    # Profiles and extension definitions (constraints) refine existing types and
+    # logical models are no resources or data types, no models are built for them.
+    # Index entries might not list kind and derivation, those are checked once decoded.
+    return (
+        definition.get("resourceType") == "StructureDefinition"
+        and definition.get("derivation") != "constraint"
+        and definition.get("kind", "resource") in TYPE_DEFINITION_KINDS
+    )
+
+
+def parse_package_index(index: dict[str, Any]) -> set[str]:
+    return {
+        posixpath.join(PACKAGE_DIRECTORY, f["filename"])
+        for f in index["files"]
+        if is_type_definition(f)
+    }
+
+
+def select_structure_definition_resources(
+    archive: tarfile.TarFile,
+) -> Iterable[dict[str, Any]]:
+    # The package index is read first wherever it's placed in the archive, only the files
+    # it lists as type definitions are decoded. Packages without an index have each
+    # resource checked once decoded.
+    members = {
+        parse_member_name(member): member
+        for member in archive.getmembers()
+        if member.isfile()
+    }
+    index = members.get(PACKAGE_INDEX)
+    selected = (
+        parse_package_index(load_member(archive, index)) if index is not None else None
+    )
+
+    for name, member in members.items():
+        if (
+            posixpath.dirname(name) != PACKAGE_DIRECTORY
+            or not name.endswith(".json")
+            or name == PACKAGE_INDEX
+            or (selected is not None and name not in selected)
+        ):
+            continue
+
+        resource = load_member(archive, member)
+        if is_type_definition(resource):
+            yield resource
+
+
+def load_from_package(
+    path: str, strings: StringTable | None = None
+) -> Iterable[StructureDefinition]:
+    if strings is None:
+        strings = {}
+    with tarfile.open(os.path.abspath(path), mode="r:*") as archive:
+        for definition in select_structure_definition_resources(archive):
+            yield parse_structure_definition(definition, strings)
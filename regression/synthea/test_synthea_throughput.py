@@ -0,0 +1,163 @@
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Generator
+from concurrent.futures import ProcessPoolExecutor
+from types import ModuleType
+
+import pytest
+
+from benchmarks.samples import make_bundles
+from fhir_py_types.module import build_module
+
+SEED = 20190901
+TOLERANCE = float(os.environ.get("THROUGHPUT_TOLERANCE", "0.2"))
+# Fixed by default, the baseline is recorded per number of workers
+WORKERS = int(os.environ.get("THROUGHPUT_WORKERS", "2"))
+# Peak memory and relative cost differ between interpreter versions,
+# the baseline is recorded per version as well
+PYTHON_VERSION = f"py{sys.version_info.major}.{sys.version_info.minor}"
+# Synthetic corpus is used when Synthea samples are not downloaded (no network needed)
+# or when it's requested with THROUGHPUT_CORPUS=generated
+CORPUS = os.environ.get("THROUGHPUT_CORPUS")
+GENERATED_SAMPLES = int(os.environ.get("THROUGHPUT_GENERATED_SAMPLES", "100"))
+# Models of the synthetic corpus are built from the checked-in R4 subset
+SPEC_BUNDLES = [
+    os.path.join(os.path.dirname(__file__), "spec", name)
+    for name in ("fhir.types.json", "fhir.resources.json")
+]
+BASELINE_PATH = os.environ.get(
+    "THROUGHPUT_BASELINE",
+    os.path.join(os.path.dirname(__file__), "throughput-baseline.json"),
+)
+UPDATE_BASELINE = os.environ.get("THROUGHPUT_UPDATE_BASELINE") == "1"
+
+Metrics = dict[str, float]
+
+models: ModuleType | None = None
+
+
+def list_corpus(directory: str) -> list[str]:
+    filepaths = sorted(
+        os.path.join(directory, path)
+        for path in os.listdir(directory)
+        if path.endswith(".json")
+    )
+    # Deterministic order interleaving large and small bundles across workers
+    random.Random(SEED).shuffle(filepaths)
+    return filepaths
+
+
+@pytest.fixture(scope="module")
+def corpus() -> Generator[tuple[str, list[str], list[str] | None]]:
+    directory = os.path.join(os.path.dirname(__file__), "./fhir/")
+    if CORPUS != "generated" and os.path.isdir(directory):
+        # Synthea samples are validated by the models generated from the downloaded spec
+        yield "synthea", list_corpus(directory), None
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        for index, bundle in enumerate(make_bundles(GENERATED_SAMPLES, seed=SEED)):
+            with open(os.path.join(directory, f"{index}.json"), "w") as bundle_file:
+                json.dump(bundle, bundle_file)
+        yield f"generated-{GENERATED_SAMPLES}", list_corpus(directory), SPEC_BUNDLES
+
+
+def load_models(spec_bundles: list[str] | None) -> None:
+    global models
+    if spec_bundles is None:
+        import generated.resources
+
+        models = generated.resources
+        return
+
+    bundles = []
+    for path in spec_bundles:
+        with open(path) as bundle_file:
+            bundles.append(json.load(bundle_file))
+    models = build_module(bundles)
+
+
+def process_bundles(filepaths: list[str]) -> tuple[list[tuple[float, int]], float, int]:
+    assert models is not None
+    samples = []
+    reference = 0.0
+    for filepath in filepaths:
+        with open(filepath, "rb") as bundle_file:
+            content = bundle_file.read()
+        original = json.loads(content)
+
+        started = time.perf_counter()
+        models.Bundle.model_validate(original).model_dump()
+        samples.append((time.perf_counter() - started, len(original.get("entry", []))))
+
+        # Decoding and encoding the same bundle with json measures the speed of the
+        # machine, so the relative cost is comparable across runners
+        started = time.perf_counter()
+        json.dumps(json.loads(content))
+        reference += time.perf_counter() - started
+
+    return samples, reference, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(filepaths: list[str], spec_bundles: list[str] | None) -> Metrics:
+    chunks = [filepaths[index::WORKERS] for index in range(WORKERS)]
+    with ProcessPoolExecutor(
+        max_workers=WORKERS, initializer=load_models, initargs=(spec_bundles,)
+    ) as executor:
+        # Warm up every worker: build schemas of the models
+        list(executor.map(process_bundles, [filepaths[:1]] * WORKERS))
+
+        started = time.perf_counter()
+        results = list(executor.map(process_bundles, chunks))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for samples, _, _ in results for latency, _ in samples)
+    resources = sum(count for samples, _, _ in results for _, count in samples)
+    reference = sum(reference for _, reference, _ in results)
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "resources_per_second": resources / elapsed,
+        "p50_bundle_latency_ms": percentiles[49] * 1000,
+        "p99_bundle_latency_ms": percentiles[98] * 1000,
+        # Time of validation and dump relative to json decoding and encoding
+        "relative_cost": sum(latencies) / reference,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_worker_memory_mb": max(maxrss for _, _, maxrss in results) / 1024,
+    }
+
+
+def test_validation_throughput_does_not_regress(
+    corpus: tuple[str, list[str], list[str] | None],
+) -> None:
+    corpus_name, filepaths, spec_bundles = corpus
+    metrics = measure(filepaths, spec_bundles)
+    key = f"{corpus_name}/{WORKERS}-workers/{PYTHON_VERSION}"
+    print(f"{key} ({len(filepaths)} bundles): {metrics}")
+
+    baselines: dict[str, Metrics] = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as baseline_file:
+            baselines = json.load(baseline_file)
+
+    if UPDATE_BASELINE:
+        baselines[key] = metrics
+        with open(BASELINE_PATH, "w") as baseline_file:
+            json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        return
+
+    baseline = baselines.get(key)
+    if baseline is None:
+        pytest.skip(
+            f"No baseline for {key}, record it with THROUGHPUT_UPDATE_BASELINE=1"
+        )
+
+    # Absolute timings depend on the machine, they are reported only
+    for metric in ("relative_cost", "peak_worker_memory_mb"):
+        assert metrics[metric] <= baseline[metric] * (1 + TOLERANCE), metric
@@ -0,0 +1,295 @@
+import importlib.util
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+from fhir_py_types.ast import build_ast
+from fhir_py_types.cli import write_module
+from fhir_py_types.reader.bundle import parse_structure_definition
+
+SYSTEM_TYPE = "http://hl7.org/fhirpath/System."
+
+
+def make_element(
+    path: str,
+    types: list[str | dict[str, Any]],
+    min_: int = 0,
+    max_: str = "1",
+    summary: bool = False,
+) -> dict[str, Any]:
+    return {
+        "id": path,
+        "path": path,
+        "definition": f"{path} definition",
+        "min": min_,
+        "max": max_,
+        "base": {"path": path},
+        "type": [{"code": t} if isinstance(t, str) else t for t in types],
+        "isSummary": summary,
+    }
+
+
+def make_reference(*targets: str) -> dict[str, Any]:
+    return {
+        "code": "Reference",
+        "targetProfile": [
+            f"http://hl7.org/fhir/StructureDefinition/{target}" for target in targets
+        ],
+    }
+
+
+def make_primitive(id_: str, system_type: str) -> dict[str, Any]:
+    return {
+        "resourceType": "StructureDefinition",
+        "id": id_,
+        "kind": "primitive-type",
+        "type": id_,
+        "snapshot": {
+            "element": [{"id": id_, "path": id_, "definition": f"{id_} definition"}]
+        },
+        "differential": {
+            "element": [
+                make_element(f"{id_}.value", [SYSTEM_TYPE + system_type]),
+            ]
+        },
+    }
+
+
+def make_complex(
+    id_: str, elements: list[dict[str, Any]], kind: str = "complex-type"
+) -> dict[str, Any]:
+    return {
+        "resourceType": "StructureDefinition",
+        "id": id_,
+        "kind": kind,
+        "type": id_,
+        "snapshot": {
+            "element": [
+                {
+                    "id": id_,
+                    "path": id_,
+                    "definition": f"{id_} definition",
+                    "short": id_,
+                    "min": 0,
+                    "max": "*",
+                    "base": {"path": id_},
+                },
+                *elements,
+            ]
+        },
+    }
+
+
+def make_resource(id_: str, elements: list[dict[str, Any]]) -> dict[str, Any]:
+    return make_complex(
+        id_,
+        [
+            make_element(f"{id_}.id", [SYSTEM_TYPE + "String"], summary=True),
+            make_element(f"{id_}.meta", ["Meta"], summary=True),
+            *elements,
+        ],
+        kind="resource",
+    )
+
+
+# A small subset of FHIR R4 sufficient to exercise the generated run-time
+STRUCTURE_DEFINITIONS = [
+    *(
+        make_primitive(id_, system_type)
+        for id_, system_type in [
+            ("string", "String"),
+            ("boolean", "Boolean"),
+            ("code", "String"),
+            ("uri", "String"),
+            ("id", "String"),
+            ("canonical", "String"),
+            ("decimal", "Decimal"),
+            ("integer", "Integer"),
+            ("dateTime", "DateTime"),
+            ("instant", "DateTime"),
+        ]
+    ),
+    make_complex(
+        "Element",
+        [
+            make_element("Element.id", [SYSTEM_TYPE + "String"]),
+            make_element("Element.extension", ["Extension"], max_="*"),
+        ],
+    ),
+    make_complex(
+        "Extension",
+        [
+            make_element("Extension.id", [SYSTEM_TYPE + "String"]),
+            make_element("Extension.extension", ["Extension"], max_="*"),
+            make_element("Extension.url", [SYSTEM_TYPE + "String"], min_=1),
+            make_element("Extension.value[x]", ["string", "boolean", "code"]),
+        ],
+    ),
+    make_complex(
+        "Coding",
+        [
+            make_element("Coding.system", ["uri"]),
+            make_element("Coding.code", ["code"]),
+            make_element("Coding.display", ["string"]),
+        ],
+    ),
+    make_complex(
+        "CodeableConcept",
+        [
+            make_element("CodeableConcept.coding", ["Coding"], max_="*"),
+            make_element("CodeableConcept.text", ["string"]),
+        ],
+    ),
+    make_complex(
+        "Quantity",
+        [
+            make_element("Quantity.value", ["decimal"]),
+            make_element("Quantity.unit", ["string"]),
+            make_element("Quantity.system", ["uri"]),
+            make_element("Quantity.code", ["code"]),
+        ],
+    ),
+    make_complex(
+        "Period",
+        [
+            make_element("Period.start", ["dateTime"]),
+            make_element("Period.end", ["dateTime"]),
+        ],
+    ),
+    make_complex(
+        "Reference",
+        [
+            make_element("Reference.reference", ["string"]),
+            make_element("Reference.display", ["string"]),
+        ],
+    ),
+    make_complex(
+        "Meta",
+        [
+            make_element("Meta.versionId", ["id"]),
+            make_element("Meta.lastUpdated", ["instant"]),
+            make_element("Meta.profile", ["canonical"], max_="*"),
+        ],
+    ),
+    make_resource(
+        "Patient",
+        [
+            make_element("Patient.active", ["boolean"], summary=True),
+            make_element("Patient.gender", ["code"], summary=True),
+        ],
+    ),
+    make_resource("Group", [make_element("Group.name", ["string"])]),
+    make_resource(
+        "Observation",
+        [
+            make_element("Observation.contained", ["Resource"], max_="*"),
+            make_element("Observation.status", ["code"], min_=1, summary=True),
+            make_element("Observation.code", ["CodeableConcept"], min_=1, summary=True),
+            make_element(
+                "Observation.subject",
+                [make_reference("Patient", "Group")],
+                summary=True,
+            ),
+            make_element(
+                "Observation.effective[x]", ["dateTime", "Period"], summary=True
+            ),
+            make_element(
+                "Observation.value[x]",
+                ["Quantity", "CodeableConcept", "string"],
+                summary=True,
+            ),
+            make_element(
+                "Observation.component", ["BackboneElement"], max_="*", summary=True
+            ),
+            make_element(
+                "Observation.component.code",
+                ["CodeableConcept"],
+                min_=1,
+                summary=True,
+            ),
+            make_element("Observation.component.value[x]", ["Quantity", "string"]),
+        ],
+    ),
+    make_resource(
+        "Bundle",
+        [
+            make_element("Bundle.type", ["code"], min_=1),
+            make_element("Bundle.entry", ["BackboneElement"], max_="*"),
+            make_element("Bundle.entry.fullUrl", ["uri"]),
+            make_element("Bundle.entry.resource", ["Resource"]),
+        ],
+    ),
+]
+
+
+def import_module(name: str, path: Path) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    # Forward references are resolved within the module registered in sys.modules
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_resources(
+    tmp_path_factory: pytest.TempPathFactory, name: str, **options: bool
+) -> ModuleType:
+    path = tmp_path_factory.mktemp("generated") / f"{name}.py"
+    write_module(
+        str(path),
+        build_ast(
+            (parse_structure_definition(d) for d in STRUCTURE_DEFINITIONS), **options
+        ),
+    )
+    return import_module(name, path)
+
+
+@pytest.fixture(scope="session")
+def resources(tmp_path_factory: pytest.TempPathFactory) -> Iterator[ModuleType]:
+    yield generate_resources(tmp_path_factory, "generated_test_resources")
+    sys.modules.pop("generated_test_resources")
+
+
+@pytest.fixture(scope="session")
+def sparse_resources(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator[ModuleType]:
+    yield generate_resources(
+        tmp_path_factory, "generated_test_sparse_resources", sparse=True
+    )
+    sys.modules.pop("generated_test_sparse_resources")
+
+
+@pytest.fixture(scope="session")
+def interned_resources(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator[ModuleType]:
+    yield generate_resources(
+        tmp_path_factory, "generated_test_interned_resources", intern=True
+    )
+    sys.modules.pop("generated_test_interned_resources")
+
+
+@pytest.fixture(scope="session")
+def definitions_bundle() -> dict[str, Any]:
+    return {
+        "resourceType": "Bundle",
+        "type": "collection",
+        "entry": [{"resource": definition} for definition in STRUCTURE_DEFINITIONS],
+    }
+
+
+@pytest.fixture(scope="session")
+def union_resources(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator[ModuleType]:
+    yield generate_resources(
+        tmp_path_factory, "generated_test_union_resources", resource_union=True
+    )
+    sys.modules.pop("generated_test_union_resources")
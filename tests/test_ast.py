@@ -8,7 +8,7 @@ from fhir_py_types import (
     StructureDefinitionKind,
     StructurePropertyType,
 )
-from fhir_py_types.ast import build_ast
+from fhir_py_types.ast import build_ast, build_shared_ast, build_stub_ast
 
 
 def assert_eq(
@@ -31,6 +31,29 @@ def build_field_with_alias(identifier: str) -> ast.Call:
     )
 
 
+def build_elements(*elements: tuple[str, str, str, str, bool, bool]) -> ast.Assign:
+    return ast.Assign(
+        targets=[ast.Name(id="__elements__")],
+        value=ast.Dict(
+            keys=[ast.Constant(name) for name, *_ in elements],
+            values=[
+                ast.Call(
+                    func=ast.Name(id="ElementInfo"),
+                    args=[
+                        ast.Constant(element),
+                        ast.Constant(type_),
+                        ast.Constant(alias),
+                        ast.Constant(isarray),
+                        ast.Constant(required),
+                    ],
+                    keywords=[],
+                )
+                for _, element, type_, alias, isarray, required in elements
+            ],
+        ),
+    )
+
+
 def test_generates_empty_ast_from_empty_definitions() -> None:
     assert build_ast([]) == []
 
@@ -84,6 +107,17 @@ def test_generates_class_for_flat_definition() -> None:
                         simple=1,
                     ),
                     ast.Expr(value=ast.Constant(value="test resource property 1")),
+                    build_elements(
+                        ("property1", "property1", "str", "property1", False, True),
+                        (
+                            "property1__ext",
+                            "property1",
+                            "Element",
+                            "_property1",
+                            False,
+                            False,
+                        ),
+                    ),
                 ],
                 decorator_list=[],
                 type_params=[],
@@ -191,6 +225,17 @@ def test_generates_multiple_classes_for_compound_definition() -> None:
                     ast.Expr(
                         value=ast.Constant(value="nested test resource property 1")
                     ),
+                    build_elements(
+                        ("property1", "property1", "str", "property1", False, False),
+                        (
+                            "property1__ext",
+                            "property1",
+                            "Element",
+                            "_property1",
+                            False,
+                            False,
+                        ),
+                    ),
                 ],
                 decorator_list=[],
                 type_params=[],
@@ -207,6 +252,16 @@ def test_generates_multiple_classes_for_compound_definition() -> None:
                         simple=1,
                     ),
                     ast.Expr(value=ast.Constant(value="nested complex definition")),
+                    build_elements(
+                        (
+                            "complexproperty",
+                            "complexproperty",
+                            "NestedTestResource",
+                            "complexproperty",
+                            False,
+                            True,
+                        ),
+                    ),
                 ],
                 decorator_list=[],
                 type_params=[],
@@ -336,6 +391,24 @@ def test_generates_annotations_according_to_structure_type(
                         value=build_field_with_alias("_property1"),
                     ),
                     ast.Expr(value=ast.Constant(value="test resource property 1")),
+                    build_elements(
+                        (
+                            "property1",
+                            "property1",
+                            "str",
+                            "property1",
+                            isarray,
+                            required,
+                        ),
+                        (
+                            "property1__ext",
+                            "property1",
+                            "Element",
+                            "_property1",
+                            isarray,
+                            False,
+                        ),
+                    ),
                 ],
                 decorator_list=[],
                 type_params=[],
@@ -446,9 +519,390 @@ def test_unrolls_required_polymorphic_into_class_union() -> None:
                     ast.Expr(
                         value=ast.Constant(value="polymorphic property definition")
                     ),
+                    build_elements(
+                        ("monotype", "monotype", "boolean", "monotype", False, False),
+                        (
+                            "monotype__ext",
+                            "monotype",
+                            "Element",
+                            "_monotype",
+                            False,
+                            False,
+                        ),
+                        (
+                            "valueBoolean",
+                            "value[x]",
+                            "boolean",
+                            "valueBoolean",
+                            False,
+                            False,
+                        ),
+                        (
+                            "valueBoolean__ext",
+                            "value[x]",
+                            "Element",
+                            "_valueBoolean",
+                            False,
+                            False,
+                        ),
+                        (
+                            "valueQuantity",
+                            "value[x]",
+                            "Quantity",
+                            "valueQuantity",
+                            False,
+                            False,
+                        ),
+                    ),
+                ],
+                decorator_list=[],
+                type_params=[],
+            ),
+        ],
+    )
+
+
+def make_complex_definition(
+    id_: str, docstring: str, property_code: str
+) -> StructureDefinition:
+    return StructureDefinition(
+        id=id_,
+        docstring=docstring,
+        type=[StructurePropertyType(code=id_, required=True)],
+        elements={
+            "property1": StructureDefinition(
+                id="property1",
+                docstring="test property 1",
+                type=[StructurePropertyType(code=property_code, required=True)],
+                elements={},
+            )
+        },
+        kind=StructureDefinitionKind.COMPLEX,
+    )
+
+
+def test_moves_identical_definitions_to_shared_module() -> None:
+    shared_ast, versions_ast = build_shared_ast(
+        {
+            "r4": [
+                make_complex_definition("Shared", "shared", "Quantity"),
+                make_complex_definition("Quantity", "r4 quantity", "Extension"),
+            ],
+            "r5": [
+                make_complex_definition("Shared", "shared", "Quantity"),
+                make_complex_definition("Quantity", "r4 quantity", "Extension"),
+            ],
+        }
+    )
+
+    assert [ast.dump(t) for t in shared_ast] == [
+        ast.dump(t)
+        for t in build_ast(
+            [
+                make_complex_definition("Shared", "shared", "Quantity"),
+                make_complex_definition("Quantity", "r4 quantity", "Extension"),
+            ]
+        )
+    ]
+    assert {
+        version: [ast.dump(t) for t in tree] for version, tree in versions_ast.items()
+    } == {
+        version: [
+            ast.dump(
+                ast.ImportFrom(
+                    module="shared",
+                    names=[ast.alias("Quantity"), ast.alias("Shared")],
+                    level=1,
+                )
+            )
+        ]
+        for version in ("r4", "r5")
+    }
+
+
+def test_subclasses_definitions_referring_to_version_specific_definitions() -> None:
+    r4 = [
+        make_complex_definition("Shared", "shared", "Quantity"),
+        make_complex_definition("Quantity", "r4 quantity", "str"),
+        make_complex_definition("Independent", "independent", "str"),
+    ]
+    r5 = [
+        make_complex_definition("Shared", "shared", "Quantity"),
+        make_complex_definition("Quantity", "r5 quantity", "str"),
+        make_complex_definition("Independent", "independent", "str"),
+    ]
+    shared_ast, versions_ast = build_shared_ast({"r4": r4, "r5": r5})
+
+    [shared] = build_ast(r4[:1])
+    assert isinstance(shared, ast.ClassDef)
+    assert [ast.dump(t) for t in shared_ast] == [
+        ast.dump(ast.ClassDef(**{**vars(shared), "name": "_Shared"})),
+        *(ast.dump(t) for t in build_ast(r4[2:])),
+        ast.dump(
+            ast.If(
+                test=ast.Name("TYPE_CHECKING"),
+                body=[
+                    ast.Assign(targets=[ast.Name("Quantity")], value=ast.Name("Any_"))
+                ],
+                orelse=[],
+            )
+        ),
+    ]
+    for version, definitions in (("r4", r4), ("r5", r5)):
+        assert [ast.dump(t) for t in versions_ast[version]] == [
+            ast.dump(
+                ast.ImportFrom(
+                    module="shared",
+                    names=[ast.alias("Independent"), ast.alias("_Shared")],
+                    level=1,
+                )
+            ),
+            ast.dump(
+                ast.ClassDef(
+                    "Shared",
+                    bases=[ast.Name("BaseModel"), ast.Name("_Shared")],
+                    body=[
+                        ast.Expr(value=ast.Constant("shared")),
+                        ast.Assign(
+                            targets=[ast.Name("__elements__")],
+                            value=ast.Attribute(
+                                value=ast.Name("_Shared"), attr="__elements__"
+                            ),
+                        ),
+                    ],
+                    decorator_list=[],
+                    keywords=[],
+                    type_params=[],
+                )
+            ),
+            *(ast.dump(t) for t in build_ast(definitions[1:2])),
+        ]
+
+
+def test_generates_reference_targets_and_bundle_mixin() -> None:
+    assert_eq(
+        [
+            StructureDefinition(
+                id="Bundle",
+                docstring="bundle description",
+                type=[StructurePropertyType(code="Bundle", required=True)],
+                elements={
+                    "for": StructureDefinition(
+                        id="for",
+                        docstring="reference property",
+                        type=[
+                            StructurePropertyType(
+                                code="Reference",
+                                required=True,
+                                target_profile=["Patient", "Group"],
+                            )
+                        ],
+                        elements={},
+                    ),
+                    "any": StructureDefinition(
+                        id="any",
+                        docstring="untargeted reference property",
+                        type=[StructurePropertyType(code="Reference", required=True)],
+                        elements={},
+                    ),
+                },
+                kind=StructureDefinitionKind.RESOURCE,
+            )
+        ],
+        [
+            ast.ClassDef(
+                name="Bundle",
+                bases=[
+                    ast.Name(id="AnyResource"),
+                    ast.Name(id="BundleMixin"),
+                    ast.Name(id="BaseModel"),
+                ],
+                keywords=[],
+                body=[
+                    ast.Expr(value=ast.Constant(value="bundle description")),
+                    ast.AnnAssign(
+                        target=ast.Name(id="for_"),
+                        annotation=ast.Constant("Reference"),
+                        simple=1,
+                        value=ast.Call(
+                            func=ast.Name(id="Field"),
+                            args=[],
+                            keywords=[
+                                ast.keyword(arg="alias", value=ast.Constant("for"))
+                            ],
+                        ),
+                    ),
+                    ast.Expr(value=ast.Constant(value="reference property")),
+                    ast.AnnAssign(
+                        target=ast.Name(id="any"),
+                        annotation=ast.Constant("Reference"),
+                        simple=1,
+                    ),
+                    ast.Expr(value=ast.Constant(value="untargeted reference property")),
+                    ast.Assign(
+                        targets=[ast.Name(id="__reference_targets__")],
+                        value=ast.Dict(
+                            keys=[ast.Constant("for_")],
+                            values=[
+                                ast.Tuple(
+                                    elts=[
+                                        ast.Constant("Patient"),
+                                        ast.Constant("Group"),
+                                    ]
+                                )
+                            ],
+                        ),
+                    ),
+                    build_elements(
+                        ("for_", "for", "Reference", "for", False, True),
+                        ("any", "any", "Reference", "any", False, True),
+                    ),
                 ],
                 decorator_list=[],
                 type_params=[],
             ),
         ],
     )
+
+
+def test_generates_sparse_models() -> None:
+    (class_def,) = build_ast(
+        [make_complex_definition("Quantity", "quantity", "str")], sparse=True
+    )
+
+    assert isinstance(class_def, ast.ClassDef)
+    assert [ast.dump(base) for base in class_def.bases] == [
+        ast.dump(ast.Name(id="SparseBaseModel"))
+    ]
+
+
+def test_generates_resource_union_option() -> None:
+    option, class_def = build_ast(
+        [make_complex_definition("Quantity", "quantity", "str")], resource_union=True
+    )
+
+    assert ast.dump(option) == ast.dump(
+        ast.Assign(targets=[ast.Name("RESOURCE_UNION")], value=ast.Constant(True))
+    )
+    assert isinstance(class_def, ast.ClassDef)
+
+
+def test_generates_stubs_with_declarations_only() -> None:
+    stub = build_stub_ast(
+        build_ast(
+            [
+                StructureDefinition(
+                    id="Encounter",
+                    docstring="encounter description",
+                    type=[StructurePropertyType(code="Encounter", required=True)],
+                    elements={
+                        "subject": StructureDefinition(
+                            id="subject",
+                            docstring="reference property",
+                            type=[
+                                StructurePropertyType(
+                                    code="Reference",
+                                    required=True,
+                                    target_profile=["Patient"],
+                                )
+                            ],
+                            elements={},
+                        )
+                    },
+                    kind=StructureDefinitionKind.RESOURCE,
+                )
+            ]
+        )
+    )
+
+    assert [ast.dump(t) for t in stub] == [
+        ast.dump(
+            ast.ClassDef(
+                name="Encounter",
+                bases=[ast.Name(id="AnyResource"), ast.Name(id="BaseModel")],
+                keywords=[],
+                body=[
+                    ast.AnnAssign(
+                        target=ast.Name(id="subject"),
+                        annotation=ast.Constant("Reference"),
+                        simple=1,
+                    ),
+                    ast.AnnAssign(
+                        target=ast.Name(id="__reference_targets__"),
+                        annotation=ast.parse(
+                            "ClassVar_[dict[str, tuple[str, ...]]]", mode="eval"
+                        ).body,
+                        simple=1,
+                    ),
+                    ast.AnnAssign(
+                        target=ast.Name(id="__elements__"),
+                        annotation=ast.parse(
+                            "ClassVar_[dict[str, ElementInfo]]", mode="eval"
+                        ).body,
+                        simple=1,
+                    ),
+                ],
+                decorator_list=[],
+                type_params=[],
+            )
+        )
+    ]
+
+
+def test_generates_interned_aliases_for_coded_primitives() -> None:
+    definitions = [
+        StructureDefinition(
+            id=id_,
+            docstring=f"{id_} description",
+            type=[StructurePropertyType(code="str", required=True)],
+            elements={},
+            kind=StructureDefinitionKind.PRIMITIVE,
+        )
+        for id_ in ("code", "string")
+    ]
+
+    assert [ast.dump(t) for t in build_ast(definitions, intern=True)] == [
+        ast.dump(t)
+        for t in [
+            ast.Assign(
+                targets=[ast.Name("codeType")],
+                value=ast.Subscript(
+                    value=ast.Name("Annotated_"),
+                    slice=ast.Tuple(
+                        elts=[
+                            ast.Name("str"),
+                            ast.Call(
+                                func=ast.Name("AfterValidator"),
+                                args=[ast.Name("intern_table")],
+                                keywords=[],
+                            ),
+                        ]
+                    ),
+                ),
+            ),
+            ast.Expr(value=ast.Constant("code description")),
+            ast.Assign(targets=[ast.Name("stringType")], value=ast.Name("str")),
+            ast.Expr(value=ast.Constant("string description")),
+        ]
+    ]
+
+
+def test_shares_nothing_when_only_primitive_aliases_are_identical() -> None:
+    string = StructureDefinition(
+        id="string",
+        docstring="string",
+        type=[StructurePropertyType(code="str", required=True)],
+        elements={},
+        kind=StructureDefinitionKind.PRIMITIVE,
+    )
+    r4 = [string, make_complex_definition("Quantity", "r4 quantity", "string")]
+    r5 = [string, make_complex_definition("Quantity", "r5 quantity", "string")]
+    shared_ast, versions_ast = build_shared_ast({"r4": r4, "r5": r5})
+
+    assert shared_ast == []
+    assert [ast.dump(t) for t in versions_ast["r4"]] == [
+        ast.dump(t) for t in build_ast(r4)
+    ]
+    assert [ast.dump(t) for t in versions_ast["r5"]] == [
+        ast.dump(t) for t in build_ast(r5)
+    ]
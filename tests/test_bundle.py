@@ -0,0 +1,89 @@
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+TRANSACTION_BUNDLE: dict[str, Any] = {
+    "resourceType": "Bundle",
+    "type": "transaction",
+    "entry": [
+        {
+            "fullUrl": "urn:uuid:7f2b4c1e",
+            "resource": {"resourceType": "Patient", "id": "patient-1"},
+        },
+        {
+            "fullUrl": "http://example.org/fhir/Group/group-1",
+            "resource": {"resourceType": "Group", "id": "group-1"},
+        },
+        {
+            "fullUrl": "urn:uuid:0c9a3d55",
+            "resource": {
+                "resourceType": "Observation",
+                "status": "final",
+                "code": {"text": "weight"},
+                "subject": {"reference": "urn:uuid:7f2b4c1e"},
+            },
+        },
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    ("reference", "expected_id"),
+    [
+        ("urn:uuid:7f2b4c1e", "patient-1"),
+        ("http://example.org/fhir/Group/group-1", "group-1"),
+        ("Patient/patient-1", "patient-1"),
+        ("Group/group-1/_history/2", "group-1"),
+        ("Patient/unknown", None),
+        ("#contained", None),
+    ],
+)
+def test_resolves_references_against_bundle_entries(
+    resources: ModuleType, reference: str, expected_id: str | None
+) -> None:
+    bundle = resources.Bundle.model_validate(TRANSACTION_BUNDLE)
+
+    resolved = bundle.index().resolve(reference)
+
+    assert (resolved.id if resolved is not None else None) == expected_id
+
+
+def test_resolves_reference_model_against_allowed_target_types(
+    resources: ModuleType,
+) -> None:
+    bundle = resources.Bundle.model_validate(TRANSACTION_BUNDLE)
+    observation = bundle.entry[2].resource
+    target_types = resources.Observation.__reference_targets__["subject"]
+    index = bundle.index()
+
+    assert target_types == ("Patient", "Group")
+    assert index.resolve(observation.subject, target_types) is bundle.entry[0].resource
+    with pytest.raises(ValueError, match="resolves to Patient"):
+        index.resolve(observation.subject, ["Group"])
+
+
+def test_resolves_against_current_entries(resources: ModuleType) -> None:
+    bundle = resources.Bundle.model_validate(TRANSACTION_BUNDLE)
+    index = bundle.index()
+
+    bundle.entry[0] = resources.BundleEntry(
+        fullUrl="urn:uuid:1d5e0b7a",
+        resource=resources.Patient(resourceType="Patient", id="patient-2"),
+    )
+
+    assert index.resolve("urn:uuid:7f2b4c1e").id == "patient-1"
+    assert bundle.index().resolve("urn:uuid:7f2b4c1e") is None
+    assert bundle.index().resolve("urn:uuid:1d5e0b7a").id == "patient-2"
+    bundle.entry[1].resource.id = "group-2"
+    assert bundle.index().resolve("Group/group-2") is bundle.entry[1].resource
+    bundle.entry = bundle.entry[1:]
+    assert bundle.index().resolve("Patient/patient-2") is None
+
+
+def test_index_is_not_serialized_nor_compared(resources: ModuleType) -> None:
+    bundle = resources.Bundle.model_validate(TRANSACTION_BUNDLE)
+    bundle.index()
+
+    assert bundle.model_dump() == TRANSACTION_BUNDLE
+    assert bundle == resources.Bundle.model_validate(TRANSACTION_BUNDLE)
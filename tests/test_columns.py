@@ -0,0 +1,101 @@
+import csv
+import io
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+OBSERVATIONS: list[dict[str, Any]] = [
+    {
+        "resourceType": "Observation",
+        "id": "weight",
+        "status": "final",
+        "code": {
+            "coding": [
+                {"system": "http://loinc.org", "code": "29463-7"},
+                {"system": "http://snomed.info/sct", "code": "27113001"},
+            ]
+        },
+        "valueQuantity": {"value": 72.5, "unit": "kg"},
+    },
+    {
+        "resourceType": "Observation",
+        "status": "preliminary",
+        "code": {"text": "note"},
+        "valueString": "n/a",
+    },
+]
+
+PATHS = ["id", "status", "code.coding.code", "valueQuantity.value", "value"]
+
+
+def test_describes_columns_by_element_metadata(resources: ModuleType) -> None:
+    exporter = resources.ColumnExporter("Observation", PATHS)
+
+    assert [tuple(column) for column in exporter.columns] == [
+        ("id", "str", False, True, None),
+        ("status", "code", False, False, None),
+        ("code.coding.code", "code", True, True, None),
+        ("valueQuantity.value", "decimal", False, True, "d"),
+        ("value", None, False, True, None),
+    ]
+
+
+def test_batches_values_into_columns(resources: ModuleType) -> None:
+    exporter = resources.ColumnExporter("Observation", PATHS)
+    exporter.extend(resources.Observation.model_validate(o) for o in OBSERVATIONS)
+
+    assert exporter.size == 2
+    assert exporter.data == {
+        "id": ["weight", None],
+        "status": ["final", "preliminary"],
+        "code.coding.code": [["29463-7", "27113001"], []],
+        "valueQuantity.value": pytest.approx([72.5, 0]),
+        "value": [{"value": 72.5, "unit": "kg"}, "n/a"],
+    }
+    assert exporter.data["valueQuantity.value"].typecode == "d"
+    assert exporter.nulls == {"valueQuantity.value": bytearray([0, 1])}
+
+
+def test_writes_csv(resources: ModuleType) -> None:
+    exporter = resources.ColumnExporter("Observation", PATHS)
+    exporter.extend(resources.Observation.model_validate(o) for o in OBSERVATIONS)
+    output = io.StringIO()
+    exporter.write_csv(output)
+
+    assert list(csv.reader(io.StringIO(output.getvalue()))) == [
+        PATHS,
+        [
+            "weight",
+            "final",
+            '["29463-7", "27113001"]',
+            "72.5",
+            '{"unit": "kg", "value": 72.5}',
+        ],
+        ["", "preliminary", "[]", "", "n/a"],
+    ]
+
+
+def test_reads_written_columns(resources: ModuleType) -> None:
+    exporter = resources.ColumnExporter("Observation", PATHS)
+    exporter.extend(resources.Observation.model_validate(o) for o in OBSERVATIONS)
+    output = io.BytesIO()
+    exporter.write_columns(output)
+    output.seek(0)
+
+    restored = resources.ColumnExporter.read_columns(output)
+
+    assert restored.columns == exporter.columns
+    assert restored.size == exporter.size
+    assert restored.data == exporter.data
+    assert restored.nulls == exporter.nulls
+
+
+def test_rejects_other_resource_types(resources: ModuleType) -> None:
+    exporter = resources.ColumnExporter("Observation", PATHS)
+    exporter.extend(resources.Observation.model_validate(o) for o in OBSERVATIONS)
+
+    with pytest.raises(ValueError, match="Expected Observation, got Patient"):
+        exporter.extend([resources.Patient(id="example")])
+    with pytest.raises(ValueError, match="not found"):
+        resources.ColumnExporter("Observation", ["valueQuantity.unknown"])
@@ -0,0 +1,85 @@
+import json
+
+from fhir_py_types import StructureDefinition, StructurePropertyType
+from fhir_py_types.reader.bundle import (
+    StringTable,
+    parse_structure_definition,
+    read_structure_definitions,
+)
+
+
+def test_stores_sequences_as_tuples() -> None:
+    definition = StructureDefinition(
+        id="TestResource",
+        docstring="test resource description",
+        type=[StructurePropertyType(code="Reference", target_profile=["Patient"])],
+        elements={},
+    )
+
+    assert definition.type == (
+        StructurePropertyType(code="Reference", target_profile=("Patient",)),
+    )
+    assert definition.type[0].target_profile == ("Patient",)
+
+
+def test_deduplicates_repeated_strings_within_load() -> None:
+    definition = json.dumps(
+        {
+            "resourceType": "StructureDefinition",
+            "id": "Observation",
+            "kind": "resource",
+            "type": "Observation",
+            "snapshot": {
+                "element": [
+                    {
+                        "id": "Observation",
+                        "path": "Observation",
+                        "short": "Observation",
+                        "definition": "Measurements",
+                        "min": 0,
+                        "max": "*",
+                        "base": {"path": "Observation"},
+                    },
+                    *(
+                        {
+                            "id": f"Observation.{name}",
+                            "path": f"Observation.{name}",
+                            "definition": "Measurements",
+                            "min": 0,
+                            "max": "1",
+                            "type": [
+                                {
+                                    "code": "Reference",
+                                    "targetProfile": [
+                                        "http://hl7.org/fhir/StructureDefinition/Patient"
+                                    ],
+                                }
+                            ],
+                        }
+                        for name in ("subject", "focus")
+                    ),
+                ]
+            },
+        }
+    )
+    strings: StringTable = {}
+    first, second = (
+        read_structure_definitions(
+            {"entry": [{"resource": json.loads(definition)}]}, strings
+        )
+        for _ in range(2)
+    )
+    other = parse_structure_definition(json.loads(definition))
+
+    [first_type], [second_type], [other_type] = (
+        d.elements["subject"].type for d in (*first, *second, other)
+    )
+    assert first_type.code is second_type.code
+    [first_profile], [second_profile] = (
+        t.target_profile or () for t in (first_type, second_type)
+    )
+    assert first_profile == "Patient"
+    assert first_profile is second_profile
+    # Strings are not interned globally, so they are freed along with the definitions
+    assert other_type.code == first_type.code
+    assert other_type.code is not first_type.code
@@ -0,0 +1,118 @@
+from types import ModuleType
+from typing import Any
+
+from pydantic import ConfigDict
+
+OBSERVATION: dict[str, Any] = {
+    "resourceType": "Observation",
+    "id": "weight",
+    "meta": {"versionId": "1", "lastUpdated": "2024-01-01T00:00:00Z"},
+    "status": "final",
+    "_status": {"extension": [{"url": "http://example.org/source"}]},
+    "code": {"coding": [{"system": "http://loinc.org", "code": "29463-7"}]},
+    "valueQuantity": {"value": 72.5, "unit": "kg"},
+    "contained": [{"resourceType": "Patient", "id": "example", "gender": "male"}],
+}
+
+
+def test_equal_content_gives_equal_fingerprint(resources: ModuleType) -> None:
+    from_json = resources.Observation.model_validate_json(
+        """{
+            "contained": [{"gender": "male", "id": "example", "resourceType": "Patient"}],
+            "valueQuantity": {"unit": "kg", "value": 72.50},
+            "code": {"coding": [{"code": "29463-7", "system": "http://loinc.org"}]},
+            "_status": {"extension": [{"url": "http://example.org/source"}]},
+            "status": "final",
+            "meta": {"lastUpdated": "2024-01-01T00:00:00Z", "versionId": "1"},
+            "id": "weight",
+            "resourceType": "Observation"
+        }"""
+    )
+    by_name = resources.Observation(
+        **{k: v for k, v in OBSERVATION.items() if k != "_status"},
+        status__ext=OBSERVATION["_status"],
+    )
+
+    fingerprint = resources.Observation.model_validate(OBSERVATION).fingerprint()
+
+    assert from_json.fingerprint() == fingerprint
+    assert by_name.fingerprint() == fingerprint
+
+
+def test_changed_content_gives_different_fingerprint(resources: ModuleType) -> None:
+    observation = resources.Observation.model_validate(OBSERVATION)
+    fingerprint = observation.fingerprint()
+
+    observation.contained[0].gender = "female"
+    changed = observation.fingerprint()
+    observation.contained[0].gender = "male"
+
+    assert changed != fingerprint
+    assert observation.fingerprint() == fingerprint
+    assert (
+        resources.Observation.model_validate(
+            {**OBSERVATION, "valueQuantity": {"value": "72.5", "unit": "kg"}}
+        ).fingerprint()
+        == fingerprint
+    )
+    assert (
+        resources.Observation.model_validate(
+            {**OBSERVATION, "valueString": "72.5"} | {"valueQuantity": None}
+        ).fingerprint()
+        != fingerprint
+    )
+
+
+def test_ignores_meta_version(resources: ModuleType) -> None:
+    observation = resources.Observation.model_validate(OBSERVATION)
+    updated = resources.Observation.model_validate(
+        {**OBSERVATION, "meta": {"versionId": "2"}}
+    )
+    without_meta = resources.Observation.model_validate(
+        {k: v for k, v in OBSERVATION.items() if k != "meta"}
+    )
+    profiled = resources.Observation.model_validate(
+        {**OBSERVATION, "meta": {"profile": ["http://example.org/weight"]}}
+    )
+
+    assert updated.fingerprint() != observation.fingerprint()
+    assert (
+        updated.fingerprint(ignore_meta_version=True)
+        == observation.fingerprint(ignore_meta_version=True)
+        == without_meta.fingerprint(ignore_meta_version=True)
+        != profiled.fingerprint(ignore_meta_version=True)
+    )
+
+
+def test_fingerprints_in_place_list_changes(resources: ModuleType) -> None:
+    observation = resources.Observation.model_validate(OBSERVATION)
+    fingerprint = observation.fingerprint()
+
+    observation.code.coding.append(resources.Coding(code="b"))
+    appended = observation.fingerprint()
+    del observation.code.coding[0]
+    deleted = observation.fingerprint()
+
+    assert len({fingerprint, appended, deleted}) == 3
+    assert (
+        deleted
+        == resources.Observation.model_validate(
+            {**OBSERVATION, "code": {"coding": [{"code": "b"}]}}
+        ).fingerprint()
+    )
+
+
+def test_caches_fingerprint_of_frozen_models(resources: ModuleType) -> None:
+    class FrozenObservation(resources.Observation):  # type: ignore[name-defined]
+        model_config = ConfigDict(frozen=True)
+
+    observation = resources.Observation.model_validate(OBSERVATION)
+    frozen = FrozenObservation.model_validate(OBSERVATION)
+    fingerprint = frozen.fingerprint()
+
+    assert fingerprint == observation.fingerprint()
+    assert "__fingerprint__" not in observation.__dict__
+    assert frozen.__dict__["__fingerprint__"][1] == fingerprint
+    assert frozen.fingerprint() == fingerprint
+    assert frozen.model_dump() == OBSERVATION
+    assert frozen == FrozenObservation.model_validate(OBSERVATION)
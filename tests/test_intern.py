@@ -0,0 +1,54 @@
+import json
+from types import ModuleType
+from typing import Any
+
+OBSERVATION: dict[str, Any] = {
+    "resourceType": "Observation",
+    "status": "final",
+    "code": {
+        "coding": [{"system": "http://loinc.org", "code": "29463-7"}],
+        "text": "Body weight",
+    },
+    "valueQuantity": {
+        "value": 72.5,
+        "unit": "kg",
+        "system": "http://unitsofmeasure.org",
+        "code": "kg",
+    },
+    "meta": {"profile": ["http://example.org/StructureDefinition/weight"]},
+}
+
+
+def test_shares_repeated_coded_values(interned_resources: ModuleType) -> None:
+    interned_resources.intern_table.clear()
+    first = interned_resources.Observation.model_validate(OBSERVATION)
+    second = interned_resources.Observation.model_validate_json(json.dumps(OBSERVATION))
+
+    assert first.code.coding[0].system is second.code.coding[0].system
+    assert first.status is second.status
+    assert first.valueQuantity.code is second.valueQuantity.code
+    assert first.meta.profile[0] is second.meta.profile[0]
+    assert first.code.text is not second.code.text
+    assert interned_resources.intern_table.stats() == (6, 6, 6, 1 << 16)
+
+
+def test_dumps_same_as_default_models(
+    resources: ModuleType, interned_resources: ModuleType
+) -> None:
+    default = resources.Observation.model_validate(OBSERVATION)
+    interned = interned_resources.Observation.model_validate(OBSERVATION)
+
+    assert interned.model_dump() == default.model_dump() == OBSERVATION
+    assert resources.codeType is str
+
+
+def test_intern_table_is_bounded(interned_resources: ModuleType) -> None:
+    table = interned_resources.InternTable(maxsize=2)
+    values = ["".join(["code", str(n % 3)]) for n in range(6)]
+
+    interned = [table(value) for value in values]
+
+    assert interned[3] is interned[0]
+    assert interned[4] is interned[1]
+    assert interned[5] is values[5]
+    assert table.stats() == (2, 4, 2, 2)
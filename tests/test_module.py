@@ -0,0 +1,150 @@
+import sys
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+from fhir_py_types import module as module_
+from fhir_py_types.module import build_module, evict_module
+
+OBSERVATION: dict[str, Any] = {
+    "resourceType": "Observation",
+    "status": "final",
+    "code": {"text": "weight"},
+    "valueQuantity": {"value": 72.5, "unit": "kg"},
+    "contained": [{"resourceType": "Patient", "id": "example"}],
+}
+
+THREADS = 8
+
+
+@pytest.fixture()
+def built_module(definitions_bundle: dict[str, Any]) -> Iterator[ModuleType]:
+    module = build_module([definitions_bundle])
+    yield module
+    evict_module(module)
+
+
+def test_builds_module_from_bundles(
+    built_module: ModuleType, resources: ModuleType
+) -> None:
+    observation = built_module.Observation.model_validate(OBSERVATION)
+
+    assert sys.modules[built_module.__name__] is built_module
+    assert isinstance(observation.contained[0], built_module.Patient)
+    assert (
+        observation.model_dump()
+        == resources.Observation.model_validate(OBSERVATION).model_dump()
+    )
+
+
+def test_caches_module_by_input(
+    built_module: ModuleType, definitions_bundle: dict[str, Any]
+) -> None:
+    sparse = build_module([definitions_bundle], sparse=True)
+
+    assert build_module([dict(definitions_bundle)]) is built_module
+    assert sparse is not built_module
+    assert issubclass(sparse.Patient, sparse.SparseBaseModel)
+
+    evict_module(sparse)
+
+
+def test_evicts_least_recently_built_modules(
+    built_module: ModuleType,
+    definitions_bundle: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(module_, "MAX_CACHED_MODULES", 1)
+
+    sparse = build_module([definitions_bundle], sparse=True)
+
+    assert built_module.__name__ not in sys.modules
+    assert sys.modules[sparse.__name__] is sparse
+    # Models of evicted modules are still built and validated on the first use
+    assert (
+        built_module.Observation.model_validate(OBSERVATION).model_dump()
+        == sparse.Observation.model_validate(OBSERVATION).model_dump()
+    )
+    assert build_module([definitions_bundle]) is not built_module
+
+    evict_module(sparse)
+    assert sparse.__name__ not in sys.modules
+    assert build_module([definitions_bundle], sparse=True) is not sparse
+
+
+def test_returns_built_module_to_concurrent_builds(
+    definitions_bundle: dict[str, Any],
+) -> None:
+    barrier = threading.Barrier(THREADS)
+
+    def build(_: int) -> ModuleType:
+        barrier.wait()
+        return build_module([definitions_bundle], intern=True)
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        modules = list(executor.map(build, range(THREADS)))
+
+    assert all(module is modules[0] for module in modules)
+    assert modules[0].Patient.model_validate({"resourceType": "Patient"})
+    evict_module(modules[0])
+
+
+def test_returns_cached_module_while_other_input_is_built(
+    built_module: ModuleType,
+    definitions_bundle: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    started = threading.Event()
+    release = threading.Event()
+    compile_module = module_.compile_module
+
+    def blocking_compile_module(
+        name: str,
+        bundles: list[dict[str, Any]],
+        sparse: bool,
+        intern: bool,
+        union: bool,
+    ) -> ModuleType:
+        started.set()
+        assert release.wait(timeout=10)
+        return compile_module(name, bundles, sparse, intern, union)
+
+    monkeypatch.setattr(module_, "compile_module", blocking_compile_module)
+
+    with ThreadPoolExecutor(2) as executor:
+        building = executor.submit(
+            build_module, [definitions_bundle], resource_union=True
+        )
+        waiting = executor.submit(
+            build_module, [definitions_bundle], resource_union=True
+        )
+        assert started.wait(timeout=10)
+
+        assert build_module([definitions_bundle]) is built_module
+        assert not building.done()
+
+        release.set()
+        union = building.result()
+
+    assert waiting.result() is union
+    evict_module(union)
+
+
+def test_does_not_cache_failed_builds(
+    definitions_bundle: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def failing_compile_module(*args: object) -> ModuleType:
+        raise ValueError("invalid definitions")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(module_, "compile_module", failing_compile_module)
+        with pytest.raises(ValueError, match="invalid definitions"):
+            build_module([definitions_bundle], resource_union=True)
+
+    union = build_module([definitions_bundle], resource_union=True)
+    assert union.RESOURCE_UNION
+    evict_module(union)
@@ -0,0 +1,186 @@
+import io
+import json
+import tarfile
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fhir_py_types.reader.package import load_from_package
+
+
+def make_primitive_structure_definition(id_: str) -> dict[str, Any]:
+    return {
+        "resourceType": "StructureDefinition",
+        "id": id_,
+        "kind": "primitive-type",
+        "type": id_,
+        "snapshot": {
+            "element": [
+                {
+                    "id": id_,
+                    "path": id_,
+                    "definition": f"{id_} description",
+                    "min": 0,
+                    "max": "*",
+                }
+            ]
+        },
+        "differential": {
+            "element": [
+                {
+                    "id": f"{id_}.value",
+                    "path": f"{id_}.value",
+                    "definition": f"{id_} value",
+                    "min": 0,
+                    "max": "1",
+                    "type": [{"code": "http://hl7.org/fhirpath/System.String"}],
+                }
+            ]
+        },
+    }
+
+
+def write_package(
+    path: Path, members: Sequence[tuple[str, dict[str, Any] | bytes]]
+) -> str:
+    with tarfile.open(path, "w:gz") as archive:
+        for name, content in members:
+            data = (
+                content if isinstance(content, bytes) else json.dumps(content).encode()
+            )
+            member = tarfile.TarInfo(name)
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+    return str(path)
+
+
+PACKAGE_RESOURCES: list[tuple[str, dict[str, Any]]] = [
+    ("package/package.json", {"name": "test.package", "version": "0.1.0"}),
+    (
+        "package/StructureDefinition-code.json",
+        make_primitive_structure_definition("code"),
+    ),
+    ("package/ValueSet-test.json", {"resourceType": "ValueSet", "id": "test"}),
+    (
+        "package/StructureDefinition-uri.json",
+        make_primitive_structure_definition("uri"),
+    ),
+    (
+        "package/example/StructureDefinition-example.json",
+        make_primitive_structure_definition("example"),
+    ),
+]
+
+PACKAGE_INDEX: tuple[str, dict[str, Any]] = (
+    "package/.index.json",
+    {
+        "index-version": 1,
+        "files": [
+            {
+                "filename": "StructureDefinition-code.json",
+                "resourceType": "StructureDefinition",
+            },
+            {"filename": "ValueSet-test.json", "resourceType": "ValueSet"},
+            {
+                "filename": "StructureDefinition-uri.json",
+                "resourceType": "StructureDefinition",
+            },
+        ],
+    },
+)
+
+
+@pytest.mark.parametrize(
+    "members",
+    [
+        [PACKAGE_INDEX, *PACKAGE_RESOURCES],
+        [*PACKAGE_RESOURCES, PACKAGE_INDEX],
+        PACKAGE_RESOURCES,
+    ],
+    ids=["index-first", "index-last", "no-index"],
+)
+def test_loads_structure_definitions_from_package(
+    tmp_path: Path, members: list[tuple[str, dict[str, Any]]]
+) -> None:
+    package = write_package(tmp_path / "package.tgz", members)
+
+    assert [d.id for d in load_from_package(package)] == ["code", "uri"]
+
+
+def test_skips_files_not_listed_in_package_index(tmp_path: Path) -> None:
+    index_name, index = PACKAGE_INDEX
+    package = write_package(
+        tmp_path / "package.tgz",
+        [
+            (index_name, {**index, "files": index["files"][:1]}),
+            *PACKAGE_RESOURCES,
+        ],
+    )
+
+    assert [d.id for d in load_from_package(package)] == ["code"]
+
+
+def test_reads_package_index_before_other_files(tmp_path: Path) -> None:
+    package = write_package(
+        tmp_path / "package.tgz",
+        [
+            *PACKAGE_RESOURCES,
+            # Files not listed in the index are not decoded even if placed before it
+            ("package/Binary-invalid.json", b"{not json"),
+            PACKAGE_INDEX,
+        ],
+    )
+
+    assert [d.id for d in load_from_package(package)] == ["code", "uri"]
+
+
+def make_structure_definition(
+    id_: str, kind: str, derivation: str = "specialization"
+) -> dict[str, Any]:
+    return {
+        **make_primitive_structure_definition(id_),
+        "kind": kind,
+        "type": "Patient" if derivation == "constraint" else id_,
+        "derivation": derivation,
+    }
+
+
+@pytest.mark.parametrize("indexed", [True, False], ids=["index", "no-index"])
+def test_skips_profiles_and_logical_models(tmp_path: Path, indexed: bool) -> None:
+    definitions = [
+        ("code", make_primitive_structure_definition("code")),
+        (
+            "us-core-patient",
+            make_structure_definition("us-core-patient", "resource", "constraint"),
+        ),
+        ("Sample", make_structure_definition("Sample", "logical")),
+    ]
+    index = (
+        "package/.index.json",
+        {
+            "index-version": 2,
+            "files": [
+                {
+                    "filename": f"StructureDefinition-{id_}.json",
+                    "resourceType": "StructureDefinition",
+                    "kind": definition["kind"],
+                    "derivation": definition.get("derivation"),
+                }
+                for id_, definition in definitions
+            ],
+        },
+    )
+    package = write_package(
+        tmp_path / "package.tgz",
+        [
+            *([index] if indexed else []),
+            *(
+                (f"package/StructureDefinition-{id_}.json", definition)
+                for id_, definition in definitions
+            ),
+        ],
+    )
+
+    assert [d.id for d in load_from_package(package)] == ["code"]
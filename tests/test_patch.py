@@ -0,0 +1,113 @@
+import copy
+from types import ModuleType
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+OBSERVATION: dict[str, Any] = {
+    "resourceType": "Observation",
+    "id": "weight",
+    "status": "final",
+    "code": {"coding": [{"system": "http://loinc.org", "code": "29463-7"}]},
+    "subject": {"reference": "Patient/example"},
+    "valueQuantity": {"value": 72.5, "unit": "kg"},
+    "contained": [
+        {"resourceType": "Patient", "id": "example", "gender": "male"},
+        {"resourceType": "Group", "id": "family", "name": "Family"},
+    ],
+}
+
+
+def make_changed_observation() -> dict[str, Any]:
+    changed = copy.deepcopy(OBSERVATION)
+    changed["_status"] = {"extension": [{"url": "http://example.org/source"}]}
+    changed["valueQuantity"]["value"] = 73.0
+    del changed["subject"]
+    changed["code"]["coding"].append({"code": "8302-2"})
+    changed["contained"] = changed["contained"][:1]
+    return changed
+
+
+def test_diff_of_equal_instances_is_empty(resources: ModuleType) -> None:
+    old = resources.Observation.model_validate(OBSERVATION)
+
+    assert resources.diff(old, old) == []
+    assert resources.diff(old, resources.Observation.model_validate(OBSERVATION)) == []
+
+
+@pytest.mark.parametrize("models", ["resources", "sparse_resources"])
+def test_diff_emits_json_patch_with_fhir_aliases(
+    request: pytest.FixtureRequest, models: str
+) -> None:
+    module = request.getfixturevalue(models)
+
+    patch = module.diff(
+        module.Observation.model_validate(OBSERVATION),
+        module.Observation.model_validate(make_changed_observation()),
+    )
+
+    assert patch == [
+        {
+            "op": "add",
+            "path": "/_status",
+            "value": {"extension": [{"url": "http://example.org/source"}]},
+        },
+        {"op": "remove", "path": "/subject"},
+        {"op": "replace", "path": "/valueQuantity/value", "value": 73.0},
+        {"op": "remove", "path": "/contained/1"},
+        {"op": "add", "path": "/code/coding/1", "value": {"code": "8302-2"}},
+    ]
+
+
+def test_apply_patch_produces_new_instance(resources: ModuleType) -> None:
+    old = resources.Observation.model_validate(OBSERVATION)
+    new = resources.Observation.model_validate(make_changed_observation())
+    untouched = old.contained[0]
+
+    resources.apply_patch(old, resources.diff(old, new))
+
+    assert old == new
+    assert old.model_dump() == make_changed_observation()
+    assert old.contained[0] is untouched
+
+
+def test_apply_patch_validates_touched_paths(resources: ModuleType) -> None:
+    observation = resources.Observation.model_validate(OBSERVATION)
+
+    resources.apply_patch(
+        observation,
+        [{"op": "add", "path": "/contained/-", "value": {"resourceType": "Group"}}],
+    )
+
+    assert isinstance(observation.contained[2], resources.Group)
+    with pytest.raises(ValidationError):
+        resources.apply_patch(
+            observation,
+            [{"op": "replace", "path": "/valueQuantity/value", "value": "heavy"}],
+        )
+    with pytest.raises(ValidationError):
+        resources.apply_patch(observation, [{"op": "remove", "path": "/status"}])
+
+
+def test_apply_patch_supports_test_move_and_copy(resources: ModuleType) -> None:
+    observation = resources.Observation.model_validate(OBSERVATION)
+
+    resources.apply_patch(
+        observation,
+        [
+            {"op": "test", "path": "/contained/1/name", "value": "Family"},
+            {"op": "copy", "from": "/contained/0", "path": "/contained/-"},
+            {"op": "move", "from": "/contained/0", "path": "/contained/1"},
+        ],
+    )
+
+    assert [r.id for r in observation.contained] == ["family", "example", "example"]
+    with pytest.raises(ValueError, match="Test operation failed"):
+        resources.apply_patch(
+            observation, [{"op": "test", "path": "/status", "value": "draft"}]
+        )
+    with pytest.raises(ValueError, match="has no field"):
+        resources.apply_patch(
+            observation, [{"op": "add", "path": "/unknown", "value": "x"}]
+        )
@@ -0,0 +1,70 @@
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+OBSERVATION: dict[str, Any] = {
+    "resourceType": "Observation",
+    "status": "final",
+    "_status": {"extension": [{"url": "http://example.org/source"}]},
+    "code": {
+        "coding": [
+            {"system": "http://loinc.org", "code": "29463-7"},
+            {"system": "http://snomed.info/sct", "code": "27113001"},
+        ]
+    },
+    "valueQuantity": {"value": 72.5, "unit": "kg"},
+    "contained": [
+        {"resourceType": "Patient", "id": "example", "gender": "male"},
+        {"resourceType": "Group", "id": "family", "name": "Family"},
+    ],
+}
+
+
+def test_generates_element_metadata(resources: ModuleType) -> None:
+    elements = resources.Observation.__elements__
+
+    assert elements["valueQuantity"] == resources.ElementInfo(
+        "value[x]", "Quantity", "valueQuantity", False, False
+    )
+    assert elements["status"] == ("status", "code", "status", False, True)
+    assert elements["status__ext"] == ("status", "Element", "_status", False, False)
+    assert elements["contained"] == ("contained", "Resource", "contained", True, False)
+    assert list(elements) == list(resources.Observation.model_fields)
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("Observation.status", ["final"]),
+        ("Observation.value[x].unit", ["kg"]),
+        ("Observation.value.value", [72.5]),
+        ("Observation.valueQuantity.unit", ["kg"]),
+        ("Observation.valueString", []),
+        ("Observation.code.coding.code", ["29463-7", "27113001"]),
+        ("Observation._status.extension.url", ["http://example.org/source"]),
+        ("Observation.contained.id", ["example", "family"]),
+        ("Observation.contained.gender", ["male"]),
+        ("Patient.gender", []),
+    ],
+)
+def test_compiled_path_extracts_values(
+    resources: ModuleType, path: str, expected: list[Any]
+) -> None:
+    observation = resources.Observation.model_validate(OBSERVATION)
+
+    assert resources.compile_path(path)(observation) == expected
+
+
+def test_caches_compiled_paths(resources: ModuleType) -> None:
+    assert resources.compile_path("Observation.code") is resources.compile_path(
+        "Observation.code"
+    )
+
+
+@pytest.mark.parametrize(
+    "path", ["Unknown.id", "Coding.code.text", "Observation.unknown", "str.upper"]
+)
+def test_rejects_unknown_paths(resources: ModuleType, path: str) -> None:
+    with pytest.raises(ValueError, match="not"):
+        resources.compile_path(path)
@@ -0,0 +1,89 @@
+from types import ModuleType
+from typing import Any
+
+OBSERVATION: dict[str, Any] = {
+    "resourceType": "Observation",
+    "id": "weight",
+    "status": "final",
+    "_status": {
+        "extension": [{"url": "http://example.org/source", "valueCode": "device"}]
+    },
+    "code": {"coding": [{"system": "http://loinc.org", "code": "29463-7"}]},
+    "subject": {"reference": "Patient/example"},
+    "valueQuantity": {"value": 72.5, "unit": "kg"},
+    "contained": [{"resourceType": "Patient", "id": "example", "active": True}],
+}
+
+
+def test_does_not_store_unset_optional_fields(sparse_resources: ModuleType) -> None:
+    observation = sparse_resources.Observation.model_validate(OBSERVATION)
+
+    assert set(observation.__dict__) == {
+        "resourceType",
+        "id",
+        "status",
+        "status__ext",
+        "code",
+        "subject",
+        "valueQuantity",
+        "contained",
+    }
+    assert observation.valueString is None
+    assert observation.code.text is None
+    assert set(observation.contained[0].__dict__) == {"resourceType", "id", "active"}
+
+
+def test_dumps_same_as_default_models(
+    resources: ModuleType, sparse_resources: ModuleType
+) -> None:
+    default = resources.Observation.model_validate(OBSERVATION)
+    sparse = sparse_resources.Observation.model_validate(OBSERVATION)
+
+    assert sparse.model_dump() == default.model_dump() == OBSERVATION
+    assert sparse.model_dump_json(
+        by_alias=True, exclude_none=True
+    ) == default.model_dump_json(by_alias=True, exclude_none=True)
+
+
+def test_drops_fields_assigned_to_none(sparse_resources: ModuleType) -> None:
+    observation = sparse_resources.Observation.model_validate(OBSERVATION)
+
+    observation.valueString = "72.5 kg"
+    observation.valueQuantity = None
+
+    assert "valueQuantity" not in observation.__dict__
+    assert observation.valueQuantity is None
+    assert observation.model_dump() == {
+        **{k: v for k, v in OBSERVATION.items() if k != "valueQuantity"},
+        "valueString": "72.5 kg",
+    }
+    assert observation == sparse_resources.Observation.model_validate(
+        observation.model_dump()
+    )
+
+
+def test_dumps_unset_fields_as_none_without_exclude_none(
+    resources: ModuleType, sparse_resources: ModuleType
+) -> None:
+    default = resources.Observation.model_validate(OBSERVATION)
+    sparse = sparse_resources.Observation.model_validate(OBSERVATION)
+    default.valueString = sparse.valueString = None
+
+    options: list[dict[str, Any]] = [
+        {"exclude_none": False},
+        {"exclude_none": False, "by_alias": False},
+        {"exclude_none": False, "exclude_unset": True},
+        {
+            "exclude_none": False,
+            "include": {"id": True, "valueString": True, "code": {"text"}},
+        },
+        {"exclude_none": False, "exclude": {"valueString": True, "code": {"text"}}},
+        {"exclude_none": False, "mode": "json"},
+    ]
+    for kwargs in options:
+        assert sparse.model_dump(**kwargs) == default.model_dump(**kwargs)
+        assert list(sparse.model_dump(**kwargs)) == list(default.model_dump(**kwargs))
+    assert sparse.model_dump_json() == default.model_dump_json()
+    assert sparse.model_dump_json(indent=2, by_alias=True) == default.model_dump_json(
+        indent=2, by_alias=True
+    )
@@ -0,0 +1,77 @@
+import io
+import json
+from collections.abc import Generator
+from types import ModuleType
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+SEARCHSET_BUNDLE: dict[str, Any] = {
+    "resourceType": "Bundle",
+    "id": 'search "[{"',
+    "entry": [
+        {
+            "fullUrl": "urn:uuid:7f2b4c1e",
+            "resource": {"resourceType": "Patient", "id": "patient-1"},
+        },
+        {
+            "resource": {
+                "resourceType": "Observation",
+                "status": "final",
+                "code": {"text": 'weight \\ "kg" }]'},
+                "contained": [{"resourceType": "Group", "name": "{["}],
+            },
+        },
+    ],
+    "type": "searchset",
+}
+
+
+def read_all(
+    entries: Generator[Any, None, Any],
+) -> tuple[list[Any], Any]:
+    collected = []
+    while True:
+        try:
+            collected.append(next(entries))
+        except StopIteration as stop:
+            return collected, stop.value
+
+
+@pytest.mark.parametrize("chunk_size", [1, 16, 1 << 16])
+@pytest.mark.parametrize("as_text", [False, True])
+def test_streams_entries_and_envelope(
+    resources: ModuleType, chunk_size: int, as_text: bool
+) -> None:
+    raw = json.dumps(SEARCHSET_BUNDLE, indent=2)
+    fileobj = io.StringIO(raw) if as_text else io.BytesIO(raw.encode())
+
+    entries, envelope = read_all(
+        resources.iter_bundle_entries(fileobj, chunk_size=chunk_size)
+    )
+
+    assert entries == resources.Bundle.model_validate(SEARCHSET_BUNDLE).entry
+    assert envelope.model_dump() == {
+        k: v for k, v in SEARCHSET_BUNDLE.items() if k != "entry"
+    }
+
+
+def test_reports_entry_errors_by_location(resources: ModuleType) -> None:
+    bundle = json.loads(json.dumps(SEARCHSET_BUNDLE))
+    bundle["entry"][1]["resource"]["contained"][0]["unknown"] = True
+    entries = resources.iter_bundle_entries(io.BytesIO(json.dumps(bundle).encode()))
+
+    assert next(entries).resource.id == "patient-1"
+    with pytest.raises(ValidationError) as exc:
+        next(entries)
+    assert [error["loc"] for error in exc.value.errors()] == [
+        ("entry", 1, "resource", "contained", 0, "unknown")
+    ]
+
+
+def test_rejects_truncated_json(resources: ModuleType) -> None:
+    raw = json.dumps(SEARCHSET_BUNDLE).encode()
+
+    with pytest.raises(ValueError, match="Unexpected end of JSON"):
+        list(resources.iter_bundle_entries(io.BytesIO(raw[:-40]), chunk_size=16))
@@ -0,0 +1,55 @@
+from types import ModuleType
+from typing import Any
+
+OBSERVATION: dict[str, Any] = {
+    "resourceType": "Observation",
+    "id": "weight",
+    "status": "final",
+    "_status": {"extension": [{"url": "http://example.org/source"}]},
+    "code": {"coding": [{"system": "http://loinc.org", "code": "29463-7"}]},
+    "valueQuantity": {"value": 72.5, "unit": "kg"},
+    "component": [
+        {"code": {"text": "systolic"}, "valueQuantity": {"value": 120}},
+        {"code": {"text": "diastolic"}, "valueString": "n/a"},
+    ],
+    "contained": [{"resourceType": "Patient", "id": "example", "active": True}],
+}
+
+
+def test_generates_summary_include(resources: ModuleType) -> None:
+    summary = resources.Observation.__summary__
+
+    assert summary["resourceType"] is True
+    assert summary["status__ext"] is True
+    assert summary["valueQuantity"] is summary["effectivePeriod"] is True
+    assert summary["component"] == {"__all__": {"code": True}}
+    assert "contained" not in summary
+    assert not hasattr(resources.Coding, "__summary__")
+
+
+def test_dumps_summary_elements(resources: ModuleType) -> None:
+    observation = resources.Observation.model_validate(OBSERVATION)
+
+    assert observation.model_dump_summary() == {
+        "resourceType": "Observation",
+        "id": "weight",
+        "status": "final",
+        "_status": {"extension": [{"url": "http://example.org/source"}]},
+        "code": {"coding": [{"system": "http://loinc.org", "code": "29463-7"}]},
+        "valueQuantity": {"value": 72.5, "unit": "kg"},
+        "component": [{"code": {"text": "systolic"}}, {"code": {"text": "diastolic"}}],
+    }
+    assert observation.model_dump_summary(by_alias=False)["status__ext"] == {
+        "extension": [{"url": "http://example.org/source"}]
+    }
+
+
+def test_filters_list_items_by_index(resources: ModuleType) -> None:
+    observation = resources.Observation.model_validate(OBSERVATION)
+
+    assert observation.model_dump(
+        include={"component": {1: {"code"}}}, exclude={"contained": {0: True}}
+    ) == {"component": [{"code": {"text": "diastolic"}}]}
+    assert observation.model_dump(exclude={"component": {"__all__": {"code"}}})[
+        "component"
+    ] == [{"valueQuantity": {"value": 120}}, {"valueString": "n/a"}]
@@ -0,0 +1,61 @@
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from fhir_py_types.module import build_module, evict_module
+
+OBSERVATION: dict[str, Any] = {
+    "resourceType": "Observation",
+    "status": "final",
+    "code": {"text": "weight"},
+    "contained": [{"resourceType": "Patient", "id": "example"}],
+}
+
+THREADS = 16
+
+
+@pytest.fixture()
+def cold_module(definitions_bundle: dict[str, Any]) -> Iterator[ModuleType]:
+    # A module of its own, so none of the models is built by other tests
+    module = build_module([definitions_bundle], sparse=True, intern=True)
+    yield module
+    evict_module(module)
+
+
+def test_builds_schemas_once_under_concurrent_first_use(
+    cold_module: ModuleType, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    builds: Counter[str] = Counter()
+    # The generated models override model_rebuild to call it under a lock, so
+    # transitions of __pydantic_complete__ seen here are the builds of the schemas
+    model_rebuild = vars(BaseModel)["model_rebuild"].__func__
+
+    def count_builds(
+        cls: type[BaseModel], *, _parent_namespace_depth: int = 2, **kwargs: object
+    ) -> bool | None:
+        complete = cls.__pydantic_complete__
+        result = model_rebuild(
+            cls, _parent_namespace_depth=_parent_namespace_depth + 1, **kwargs
+        )
+        if not complete and cls.__pydantic_complete__:
+            builds[cls.__name__] += 1
+        return result
+
+    monkeypatch.setattr(BaseModel, "model_rebuild", classmethod(count_builds))
+    barrier = threading.Barrier(THREADS)
+
+    def validate(_: int) -> BaseModel:
+        barrier.wait()
+        return cold_module.Observation.model_validate(OBSERVATION)
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        observations = list(executor.map(validate, range(THREADS)))
+
+    assert builds == {"Observation": 1, "Patient": 1}
+    assert all(o.model_dump() == OBSERVATION for o in observations)
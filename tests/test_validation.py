@@ -0,0 +1,154 @@
+import json
+from types import ModuleType
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+OBSERVATION: dict[str, Any] = {
+    "resourceType": "Observation",
+    "id": "weight",
+    "status": "final",
+    "code": {"coding": [{"system": "http://loinc.org", "code": "29463-7"}]},
+    "subject": {"reference": "Patient/example"},
+    "valueQuantity": {"value": 72.5, "unit": "kg"},
+    "contained": [
+        {"resourceType": "Patient", "id": "example", "gender": "male"},
+        {"resourceType": "Group", "id": "family", "name": "Family"},
+    ],
+}
+
+BUNDLE: dict[str, Any] = {
+    "resourceType": "Bundle",
+    "type": "transaction",
+    "entry": [
+        {"fullUrl": "urn:uuid:7f2b4c1e", "resource": OBSERVATION},
+        {"resource": {"resourceType": "Patient", "id": "example"}},
+    ],
+}
+
+
+def test_validates_json_same_as_python(resources: ModuleType) -> None:
+    from_python = resources.Bundle.model_validate(BUNDLE)
+    from_json = resources.Bundle.model_validate_json(json.dumps(BUNDLE).encode())
+
+    assert from_json == from_python
+    assert from_json.model_dump() == BUNDLE
+    assert isinstance(from_json.entry[0].resource, resources.Observation)
+    assert isinstance(from_json.entry[0].resource.contained[1], resources.Group)
+
+
+@pytest.mark.parametrize(
+    ("contained", "expected_errors"),
+    [
+        (
+            [{"resourceType": "Patient", "id": "example", "unknown": True}],
+            [("extra_forbidden", ("contained", 0, "unknown"))],
+        ),
+        (
+            [{"resourceType": "Observation", "code": {"text": "weight"}}],
+            [("missing", ("contained", 0, "status"))],
+        ),
+        (
+            [{"resourceType": "Unknown"}, {"resourceType": "Coding"}],
+            [
+                ("value_error", ("contained", 0, "resourceType")),
+                ("value_error", ("contained", 1, "resourceType")),
+            ],
+        ),
+        (
+            [{"id": "example"}],
+            [("missing", ("contained", 0, "resourceType"))],
+        ),
+    ],
+)
+def test_reports_same_errors_for_json_and_python(
+    resources: ModuleType,
+    contained: list[dict[str, Any]],
+    expected_errors: list[tuple[str, tuple[str | int, ...]]],
+) -> None:
+    observation = {**OBSERVATION, "contained": contained}
+
+    with pytest.raises(ValidationError) as python_exc:
+        resources.Observation.model_validate(observation)
+    with pytest.raises(ValidationError) as json_exc:
+        resources.Observation.model_validate_json(json.dumps(observation))
+
+    assert [
+        (error["type"], error["loc"]) for error in python_exc.value.errors()
+    ] == expected_errors
+    assert json_exc.value.errors(include_url=False) == python_exc.value.errors(
+        include_url=False
+    )
+
+
+def test_validates_assigned_resources_by_resource_type(resources: ModuleType) -> None:
+    observation = resources.Observation.model_validate(OBSERVATION)
+
+    observation.contained = [{"resourceType": "Group", "name": "Family"}]
+
+    assert isinstance(observation.contained[0], resources.Group)
+
+
+def test_validates_json_same_as_python_in_resource_union(
+    union_resources: ModuleType,
+) -> None:
+    from_python = union_resources.Bundle.model_validate(BUNDLE)
+    from_json = union_resources.Bundle.model_validate_json(json.dumps(BUNDLE).encode())
+
+    assert from_json == from_python
+    assert from_json.model_dump() == BUNDLE
+    assert isinstance(from_json.entry[0].resource, union_resources.Observation)
+    assert isinstance(from_json.entry[0].resource.contained[1], union_resources.Group)
+
+
+@pytest.mark.parametrize(
+    ("contained", "expected_errors"),
+    [
+        (
+            [{"resourceType": "Patient", "id": "example", "unknown": True}],
+            [("extra_forbidden", ("contained", 0, "Patient", "unknown"))],
+        ),
+        (
+            [{"resourceType": "Unknown"}, {"resourceType": "Coding"}],
+            [
+                ("union_tag_invalid", ("contained", 0)),
+                ("union_tag_invalid", ("contained", 1)),
+            ],
+        ),
+        (
+            [{"id": "example"}],
+            [("union_tag_not_found", ("contained", 0))],
+        ),
+    ],
+)
+def test_reports_same_errors_for_json_and_python_in_resource_union(
+    union_resources: ModuleType,
+    contained: list[dict[str, Any]],
+    expected_errors: list[tuple[str, tuple[str | int, ...]]],
+) -> None:
+    observation = {**OBSERVATION, "contained": contained}
+
+    with pytest.raises(ValidationError) as python_exc:
+        union_resources.Observation.model_validate(observation)
+    with pytest.raises(ValidationError) as json_exc:
+        union_resources.Observation.model_validate_json(json.dumps(observation))
+
+    assert [
+        (error["type"], error["loc"]) for error in python_exc.value.errors()
+    ] == expected_errors
+    assert json_exc.value.errors(include_url=False) == python_exc.value.errors(
+        include_url=False
+    )
+
+
+def test_validates_assigned_resources_in_resource_union(
+    union_resources: ModuleType,
+) -> None:
+    observation = union_resources.Observation.model_validate(OBSERVATION)
+    group = union_resources.Group(name="Family")
+
+    observation.contained = [group, {"resourceType": "Patient", "id": "example"}]
+
+    assert observation.contained[0] is group
+    assert isinstance(observation.contained[1], union_resources.Patient)
@@ -0,0 +1,102 @@
+import copy
+import importlib
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from fhir_py_types.ast import build_shared_ast
+from fhir_py_types.cli import write_module
+from fhir_py_types.reader.bundle import parse_structure_definition
+
+PACKAGE = "generated_test_versions"
+CODING = {
+    "code": "a",
+    "_code": {"extension": [{"url": "http://example.org", "valueInteger": 1}]},
+}
+
+
+def make_r5_definitions(definitions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    # Extension.value[x] allows more types, as it does in R5
+    definitions = copy.deepcopy(definitions)
+    [extension] = [d for d in definitions if d["id"] == "Extension"]
+    [value] = [e for e in extension["snapshot"]["element"] if e["id"].endswith("[x]")]
+    value["type"].append({"code": "integer"})
+    return definitions
+
+
+@pytest.fixture(scope="module")
+def versions(
+    tmp_path_factory: pytest.TempPathFactory, definitions_bundle: dict[str, Any]
+) -> Iterator[tuple[ModuleType, ModuleType]]:
+    path: Path = tmp_path_factory.mktemp("versions")
+    definitions = [entry["resource"] for entry in definitions_bundle["entry"]]
+    shared_ast, versions_ast = build_shared_ast(
+        {
+            "r4": [parse_structure_definition(d) for d in definitions],
+            "r5": [
+                parse_structure_definition(d) for d in make_r5_definitions(definitions)
+            ],
+        }
+    )
+    (path / PACKAGE).mkdir()
+    (path / PACKAGE / "__init__.py").touch()
+    for name, ast_ in [("shared", shared_ast), *versions_ast.items()]:
+        write_module(str(path / PACKAGE / f"{name}.py"), ast_)
+
+    sys.path.insert(0, str(path))
+    try:
+        yield (
+            importlib.import_module(f"{PACKAGE}.r4"),
+            importlib.import_module(f"{PACKAGE}.r5"),
+        )
+    finally:
+        sys.path.remove(str(path))
+        for name in [m for m in sys.modules if m.startswith(PACKAGE)]:
+            del sys.modules[name]
+
+
+def test_validates_shared_data_types_by_version(
+    versions: tuple[ModuleType, ModuleType],
+) -> None:
+    r4, r5 = versions
+
+    coding = r5.Coding.model_validate(CODING)
+
+    assert type(coding.code__ext) is r5.Element
+    assert type(coding.code__ext.extension[0]) is r5.Extension
+    assert coding.model_dump() == CODING
+    with pytest.raises(ValidationError):
+        r4.Coding.model_validate(CODING)
+    assert r4.Coding.__elements__ is r5.Coding.__elements__
+    assert r4.Extension is not r5.Extension
+
+
+def test_resolves_shared_data_types_within_version(
+    versions: tuple[ModuleType, ModuleType],
+) -> None:
+    r4, r5 = versions
+    observation = {
+        "resourceType": "Observation",
+        "status": "final",
+        "code": {"coding": [{"code": "a"}]},
+    }
+
+    for module in (r4, r5):
+        bundle = module.Bundle.model_validate(
+            {
+                "resourceType": "Bundle",
+                "type": "collection",
+                "entry": [{"resource": observation}],
+            }
+        )
+        resource = bundle.entry[0].resource
+
+        assert type(resource) is module.Observation
+        assert type(resource.code.coding[0]) is module.Coding
+        assert isinstance(resource.code, module.BaseModel)
+        assert module.compile_path("Observation.code.coding.code")(resource) == ["a"]